@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import bisect
 import datetime as dtt
 import logging
 import time
@@ -14,7 +13,7 @@ from bokeh.io import output_notebook
 from bokeh.resources import INLINE
 from dbetto import Props
 
-from legenddashboard.util import gen_run_dict, logo_path, sort_dets
+from legenddashboard.util import gen_run_dict, get_sort_dets, logo_path
 
 log = logging.getLogger(__name__)
 
@@ -41,6 +40,8 @@ class Monitoring(param.Parameterized):
     )
     run_dict = param.Dict({}, allow_refs=True, nested_refs=True)
     periods = param.Dict({}, allow_refs=True, nested_refs=True)
+    # location of the startup snapshots, disabled if empty
+    tmp_path = param.String("")
 
     date_range = param.DateRange(
         default=(
@@ -59,8 +60,11 @@ class Monitoring(param.Parameterized):
         if notebook is True:
             output_notebook(INLINE)
         self.cached_plots = {}
+        # run dict the cached run start times and keys were computed for
+        self._run_valid_from = (None, None, None)
         self.base_path = base_path
-        self.sort_obj = sort_dets(base_path)
+        snapshot_dir = params.get("tmp_path", type(self).tmp_path) or None
+        self.sort_obj = get_sort_dets(base_path, snapshot_dir=snapshot_dir)
 
         super().__init__(**params)
 
@@ -80,7 +84,7 @@ class Monitoring(param.Parameterized):
         prod_config = Path(self.base_path) / "dataflow-config.yaml"
         self.prod_config = Props.read_from(prod_config, subst_pathvar=True)
         if self.period == "p00":
-            self.periods = gen_run_dict(self.base_path)
+            self.periods = gen_run_dict(self.base_path, snapshot_dir=snapshot_dir)
             log.debug("updating")
             self.param["period"].objects = list(self.periods)
             self.period = list(self.periods)[-1]
@@ -126,12 +130,23 @@ class Monitoring(param.Parameterized):
 
     def _get_run_dict(self, event=None):  # noqa: ARG002
         start_time = time.time()
-        valid_from = [
-            datetime.timestamp(
-                datetime.strptime(self.run_dict[entry]["timestamp"], "%Y%m%dT%H%M%SZ")
+        if self._run_valid_from[0] is not self.run_dict:
+            valid_from = np.array(
+                [
+                    datetime.timestamp(
+                        datetime.strptime(
+                            self.run_dict[entry]["timestamp"], "%Y%m%dT%H%M%SZ"
+                        )
+                    )
+                    for entry in self.run_dict
+                ]
             )
-            for entry in self.run_dict
-        ]
+            self._run_valid_from = (
+                self.run_dict,
+                valid_from,
+                np.array(list(self.run_dict)),
+            )
+        _, valid_from, run_keys = self._run_valid_from
         if isinstance(self.date_range[0], date):
             low_range = datetime.timestamp(
                 datetime.combine(self.date_range[0], datetime.min.time())
@@ -144,12 +159,9 @@ class Monitoring(param.Parameterized):
             )
         else:
             high_range = datetime.timestamp(self.date_range[1])
-        pos1 = bisect.bisect_right(valid_from, low_range)
-        pos2 = bisect.bisect_left(valid_from, high_range)
-        pos1 = max(pos1, 0)
-        pos2 = min(len(self.run_dict), pos2)
-        valid_idxs = np.arange(pos1, pos2, 1)
-        valid_keys = np.array(list(self.run_dict))[valid_idxs]
+        pos1 = np.searchsorted(valid_from, low_range, side="right")
+        pos2 = np.searchsorted(valid_from, high_range, side="left")
+        valid_keys = run_keys[pos1:pos2]
         out_dict = {key: self.run_dict[key] for key in valid_keys}
         log.debug("Time to get run dict:", extra={"time": time.time() - start_time})
         return out_dict
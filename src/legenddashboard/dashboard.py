@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import importlib.resources
@@ -8,20 +12,37 @@ import importlib.resources
 import panel as pn
 
 from legenddashboard.base import Monitoring
-from legenddashboard.geds.cal.cal_monitoring import CalMonitoring
+from legenddashboard.deferred import PageGroup
 from legenddashboard.geds.ged_monitoring import GedMonitoring
-from legenddashboard.geds.phy.phy_monitoring import PhyMonitoring
-from legenddashboard.llama.llama_monitoring import LlamaMonitoring
-from legenddashboard.muon.muon_monitoring import MuonMonitoring
-from legenddashboard.spms.sipm_monitoring import SiPMMonitoring
-from legenddashboard.util import read_config
+from legenddashboard.util import read_ahead, read_config
+
+log = logging.getLogger(__name__)
 
 
 def build_dashboard(
     config: str | dict,
     widget_widths: int = 140,
     disable_page: list[str] | None = None,
+    deferred: bool | None = None,
+    parallel: bool = False,
 ):
+    """
+    Build the monitoring dashboard.
+
+    With ``deferred`` the pages are placeholders which create their Monitoring
+    instance and load their data the first time their tab is opened. Otherwise
+    all pages are built here, with ``parallel`` the data the pages show first is
+    read concurrently in a thread pool beforehand. ``deferred`` defaults to
+    ``not parallel``.
+    """
+    if deferred is None:
+        deferred = not parallel
+    elif deferred and parallel:
+        msg = "parallel only applies to pages built at startup, not deferred ones"
+        raise ValueError(msg)
+    if disable_page is None:
+        disable_page = []
+    cache_config = read_config(config, "cache")
     config = read_config(config)
 
     # path to period data
@@ -64,11 +85,13 @@ def build_dashboard(
 
     base_monitor = Monitoring(
         base_path=data_path,
+        tmp_path=tmp_cal_path,
         name="L200 Monitoring",
     )
-    
+
     ged_monitor = GedMonitoring(
         base_path=cal_path,
+        tmp_path=tmp_cal_path,
         run_dict=base_monitor.param.run_dict,
         periods=base_monitor.param.periods,
         period=base_monitor.param.period,
@@ -79,93 +102,203 @@ def build_dashboard(
     sidebar = base_monitor.build_sidebar()
     l200_monitoring.sidebar.append(ged_monitor.build_sidebar(sidebar_instance=sidebar))
 
+    # page builders, each returns the panes of a page keyed by tab name, and
+    # the tasks reading the data the page shows first
+    pages = {}
+
+    def initial_run():
+        run = base_monitor.run
+        return base_monitor.period, run, base_monitor.run_dict.get(run)
+
+    # page modules are only imported for enabled pages, importing them registers
+    # the panel extensions they need before the template is served
     if "cal" not in disable_page:
-        cal_monitor = CalMonitoring(
-            base_path=cal_path,
-            tmp_path=tmp_cal_path,
-            run_dict=base_monitor.param.run_dict,
-            periods=base_monitor.param.periods,
-            period=base_monitor.param.period,
-            run=base_monitor.param.run,
-            date_range=base_monitor.param.date_range,
-            channel=ged_monitor.param.channel,
-            string=ged_monitor.param.string,
-            sort_by=ged_monitor.param.sort_by,
-            name="L200 Cal Monitoring",
+        from legenddashboard.geds.cal.cal_monitoring import CalMonitoring
+        from legenddashboard.geds.cal.pars import (
+            configure_par_cache,
+            get_prod_config,
+            prefetch_run,
+            set_store_dir,
         )
-        cal_panes = cal_monitor.build_cal_panes(
-            widget_widths=widget_widths,
+        from legenddashboard.prefetch import configure_prefetcher
+        from legenddashboard.render_cache import configure_render_cache, render_cache
+
+        configure_par_cache(cache_config)
+        configure_render_cache(cache_config)
+        configure_prefetcher(cache_config)
+        # parameter stores written by dashboard-ingest, split plots and renders,
+        # shared by all sessions
+        set_store_dir(tmp_cal_path)
+        render_cache.set_dir(tmp_cal_path)
+
+        def build_cal():
+            cal_monitor = CalMonitoring(
+                base_path=cal_path,
+                tmp_path=tmp_cal_path,
+                run_dict=base_monitor.param.run_dict,
+                periods=base_monitor.param.periods,
+                period=base_monitor.param.period,
+                run=base_monitor.param.run,
+                date_range=base_monitor.param.date_range,
+                channel=ged_monitor.param.channel,
+                string=ged_monitor.param.string,
+                sort_by=ged_monitor.param.sort_by,
+                name="L200 Cal Monitoring",
+            )
+            return cal_monitor.build_cal_panes(
+                widget_widths=widget_widths,
+            )
+
+        def preload_cal():
+            period, run, run_info = initial_run()
+            if run_info is None:
+                return []
+            return prefetch_run(get_prod_config(cal_path), period, run, run_info)
+
+        pages["cal"] = (
+            ["Cal. Summary", "Cal. Details", "Cal. Tracking"],
+            build_cal,
+            preload_cal,
         )
-        # cal
-        for pane in cal_panes.values():
-            l200_monitoring.main.append(pane)
 
     if "phy" not in disable_page:
-        phy_monitor = PhyMonitoring(
-            phy_path=phy_path,
-            base_path=cal_path,
-            run_dict=base_monitor.param.run_dict,
-            periods=base_monitor.param.periods,
-            period=base_monitor.param.period,
-            run=base_monitor.param.run,
-            date_range=base_monitor.param.date_range,
-            channel=ged_monitor.param.channel, 
-            string=ged_monitor.param.string,
-            sort_by=ged_monitor.param.sort_by,
-            name="L200 Phy Monitoring",
-        )
-        phy_panes = phy_monitor.build_phy_panes(
-            widget_widths=widget_widths,
-        )
-        for pane in phy_panes.values():
-            l200_monitoring.main.append(pane)
+        from legenddashboard.geds.phy.phy_monitoring import PhyMonitoring
 
-    if "spm" not in disable_page:
-        sipm_monitor = SiPMMonitoring(
-            sipm_path=sipm_path,
-            base_path=cal_path,
-            run_dict=base_monitor.param.run_dict,
-            periods=base_monitor.param.periods,
-            period=base_monitor.param.period,
-            run=base_monitor.param.run,
-            date_range=base_monitor.param.date_range,
-            name="L200 SiPM Monitoring",
-        )
-        l200_monitoring.main.append(
-            sipm_monitor.build_spm_pane(
+        def build_phy():
+            phy_monitor = PhyMonitoring(
+                phy_path=phy_path,
+                base_path=cal_path,
+                tmp_path=tmp_cal_path,
+                run_dict=base_monitor.param.run_dict,
+                periods=base_monitor.param.periods,
+                period=base_monitor.param.period,
+                run=base_monitor.param.run,
+                date_range=base_monitor.param.date_range,
+                channel=ged_monitor.param.channel,
+                string=ged_monitor.param.string,
+                sort_by=ged_monitor.param.sort_by,
+                name="L200 Phy Monitoring",
+            )
+            return phy_monitor.build_phy_panes(
                 widget_widths=widget_widths,
             )
-        )
+
+        def preload_phy():
+            period, run, _ = initial_run()
+            files = PhyMonitoring.data_files(phy_path, period, run)
+            return [partial(read_ahead, files)]
+
+        pages["phy"] = (["Phy. Monitoring", "Phy. Summary"], build_phy, preload_phy)
+
+    if "spm" not in disable_page:
+        from legenddashboard.spms.sipm_monitoring import SiPMMonitoring
+
+        def build_spm():
+            sipm_monitor = SiPMMonitoring(
+                sipm_path=sipm_path,
+                base_path=cal_path,
+                tmp_path=tmp_cal_path,
+                run_dict=base_monitor.param.run_dict,
+                periods=base_monitor.param.periods,
+                period=base_monitor.param.period,
+                run=base_monitor.param.run,
+                date_range=base_monitor.param.date_range,
+                name="L200 SiPM Monitoring",
+            )
+            return {
+                "SiPM Monitoring": sipm_monitor.build_spm_pane(
+                    widget_widths=widget_widths,
+                )
+            }
+
+        def preload_spm():
+            period, run, _ = initial_run()
+            files = SiPMMonitoring.data_files(sipm_path, period, run)
+            return [partial(read_ahead, files)]
+
+        pages["spm"] = (["SiPM Monitoring"], build_spm, preload_spm)
 
     if "muon" not in disable_page:
-        muon_monitor = MuonMonitoring(
-            muon_path=muon_path,
-            base_path=cal_path,
-            run_dict=base_monitor.param.run_dict,
-            periods=base_monitor.param.periods,
-            period=base_monitor.param.period,
-            run=base_monitor.param.run,
-            date_range=base_monitor.param.date_range,
-            name="L200 Muon Monitoring",
-        )
-        muon_panes = muon_monitor.build_muon_panes(
-            widget_widths=widget_widths,
+        from legenddashboard.muon.muon_monitoring import MuonMonitoring
+
+        def build_muon():
+            muon_monitor = MuonMonitoring(
+                muon_path=muon_path,
+                base_path=cal_path,
+                tmp_path=tmp_cal_path,
+                run_dict=base_monitor.param.run_dict,
+                periods=base_monitor.param.periods,
+                period=base_monitor.param.period,
+                run=base_monitor.param.run,
+                date_range=base_monitor.param.date_range,
+                name="L200 Muon Monitoring",
+            )
+            return muon_monitor.build_muon_panes(
+                widget_widths=widget_widths,
+            )
+
+        def preload_muon():
+            period, run, _ = initial_run()
+            files = MuonMonitoring.data_files(muon_path, period, run)
+            return [partial(read_ahead, files)]
+
+        pages["muon"] = (
+            ["Muon Cal. Plots", "Muon Mon. Plots"],
+            build_muon,
+            preload_muon,
         )
-        for pane in muon_panes.values():
-            l200_monitoring.main.append(pane)
+
     if "meta" not in disable_page:
-        l200_monitoring.main.append(
-            ged_monitor.build_meta_pane(widget_widths=widget_widths)
-        )
+
+        def build_meta():
+            return {
+                "MetaData": ged_monitor.build_meta_pane(widget_widths=widget_widths)
+            }
+
+        pages["meta"] = (["MetaData"], build_meta, None)
+
     if "llama" not in disable_page:
-        llama_monitor = LlamaMonitoring(
-            llama_path=llama_path,
-            base_path=cal_path,
-            name="L200 Llama Monitoring",
-        )
-        l200_monitoring.main.append(
-            llama_monitor.build_llama_pane(widget_widths=widget_widths)
-        )
+        from legenddashboard.llama.llama_monitoring import LlamaMonitoring
+
+        def build_llama():
+            llama_monitor = LlamaMonitoring(
+                llama_path=llama_path,
+                name="L200 Llama Monitoring",
+            )
+            return {"Llama": llama_monitor.build_llama_pane()}
+
+        def preload_llama():
+            return [partial(read_ahead, LlamaMonitoring.data_files(llama_path))]
+
+        pages["llama"] = (["Llama"], build_llama, preload_llama)
+
+    if parallel:
+        # only the reads run in the pool, the Monitoring instances link to and
+        # watch the parameters of base_monitor and ged_monitor, which param and
+        # panel do not guard against concurrent use, so they are built below
+        start_time = time.time()
+        tasks = [
+            task
+            for _, _, preload in pages.values()
+            if preload is not None
+            for task in preload()
+        ]
+        with ThreadPoolExecutor(max_workers=max(len(tasks), 1)) as pool:
+            for future in [pool.submit(task) for task in tasks]:
+                try:
+                    future.result()
+                except Exception:
+                    log.warning("could not preload page data", exc_info=True)
+        log.debug("Time to preload pages:", extra={"time": time.time() - start_time})
+
+    for tabs, build, _ in pages.values():
+        if deferred:
+            group = PageGroup(build)
+            for tab in tabs:
+                l200_monitoring.main.append(group.page(tab))
+        else:
+            for pane in build().values():
+                l200_monitoring.main.append(pane)
 
     return l200_monitoring
 
@@ -218,12 +351,29 @@ def run_dashboard() -> None:
     argparser.add_argument(
         "-d", "--disable_page", nargs="*", required=False, default=[]
     )
+    argparser.add_argument(
+        "--eager",
+        action="store_true",
+        help="build all pages at startup instead of when first opened",
+    )
+    argparser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="build all pages at startup after reading their data concurrently, "
+        "implies --eager",
+    )
     args = argparser.parse_args()
-    
-    info_path = importlib.resources.files("legenddashboard") / "information" / "general.md"
+
+    info_path = (
+        importlib.resources.files("legenddashboard") / "information" / "general.md"
+    )
 
     l200_monitoring = build_dashboard(
-        args.config_file, args.widget_widths, args.disable_page
+        args.config_file,
+        args.widget_widths,
+        args.disable_page,
+        deferred=False if args.eager else None,
+        parallel=args.parallel,
     )
 
     l200_monitoring.header.append(
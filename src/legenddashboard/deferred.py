@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import panel as pn
+import param
+from panel.reactive import ReactiveHTML
+
+log = logging.getLogger(__name__)
+
+
+class VisibilityTrigger(ReactiveHTML):
+    """
+    Invisible element setting ``visible`` the first time it is shown in the browser.
+
+    Elements in hidden tabs are not laid out, so the ``IntersectionObserver``
+    only fires once the tab holding the trigger is opened.
+    """
+
+    visible = param.Boolean(default=False)
+
+    _template = '<div id="sentinel" style="width: 1px; height: 1px;"></div>'
+
+    _scripts = {  # noqa: RUF012
+        "render": """
+        if (data.visible) {
+          return
+        }
+        state.observer = new IntersectionObserver((entries) => {
+          if (entries.some((entry) => entry.isIntersecting)) {
+            data.visible = true
+            state.observer.disconnect()
+          }
+        })
+        state.observer.observe(sentinel)
+        """,
+        "remove": """
+        if (state.observer) {
+          state.observer.disconnect()
+        }
+        """,
+    }
+
+
+class PageGroup:
+    """
+    Panes of one Monitoring instance, built on the first request for any of them.
+
+    ``build`` creates the Monitoring instance, loads its data and returns its
+    panes keyed by tab name, as ``build_cal_panes`` and friends do.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._panes = None
+        self._lock = threading.Lock()
+
+    def panes(self) -> dict:
+        with self._lock:
+            if self._panes is None:
+                start_time = time.time()
+                self._panes = self._build()
+                log.debug(
+                    "Time to build page:", extra={"time": time.time() - start_time}
+                )
+            return self._panes
+
+    def page(self, name: str, sizing_mode="scale_both") -> pn.Column:
+        """
+        Placeholder tab named ``name`` replaced by its pane once it becomes visible.
+        """
+        trigger = VisibilityTrigger(width=1, height=1, margin=0)
+        page = pn.Column(
+            trigger,
+            pn.indicators.LoadingSpinner(value=True, width=50, height=50),
+            name=name,
+            sizing_mode=sizing_mode,
+        )
+
+        def load(event):
+            if not event.new:
+                return
+            try:
+                page.objects = [self.panes()[name]]
+            except Exception:
+                log.exception("could not build page %s", name)
+                page.objects = [pn.pane.Markdown(f"### Could not load {name}")]
+
+        trigger.param.watch(load, "visible")
+        return page
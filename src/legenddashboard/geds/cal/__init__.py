@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from legenddashboard.geds.cal.detailed_plots import (
     all_detailed_plots,
+    detail_figure,
     detailed_plots,
+    is_interactive,
     plot_cut_spectra,
     plot_spectrum,
     plot_survival_frac,
     track_peaks,
 )
+from legenddashboard.geds.cal.plot_shelf import detached_figures, pyplot_lock
 from legenddashboard.geds.cal.summary_plots import (
     get_aoe_results,
     plot_alpha,
@@ -41,12 +44,16 @@ from legenddashboard.geds.cal.tracking_plots import (
 
 __all__ = [
     "all_detailed_plots",
+    "detached_figures",
+    "detail_figure",
     "detailed_plots",
+    "is_interactive",
     "plot_cut_spectra",
     "plot_energy_residuals_period",
     "plot_spectrum",
     "plot_survival_frac",
     "plot_tracking",
+    "pyplot_lock",
     "track_peaks",
 ]
 
@@ -2,30 +2,96 @@ from __future__ import annotations
 
 import argparse
 import logging
-import pickle as pkl
-import shelve
 import time
+from functools import partial
 from pathlib import Path
 
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 import panel as pn
 import param
 
 import legenddashboard.geds.string_visulization as visu
 from legenddashboard.geds import cal
+from legenddashboard.geds.cal.pars import (
+    configure_par_cache,
+    load_plot_index,
+    load_plot_shelf,
+    par_cache,
+    plot_file,
+    prefetch_run,
+    set_store_dir,
+)
 from legenddashboard.geds.ged_monitoring import GedMonitoring
-from legenddashboard.util import logo_path, read_config, sorter
+from legenddashboard.prefetch import configure_prefetcher, prefetcher
+from legenddashboard.render_cache import configure_render_cache, render_cache
+from legenddashboard.util import LRUCache, logo_path, read_config, sorter
 
 log = logging.getLogger(__name__)
 
+# somehow TUM server needs Agg -> needs fix in the future
+mpl.use("Agg")
+
+# plotly for the detailed plots, katex/mathjax for the summary plot labels
+pn.extension("plotly", "katex", "mathjax")
+
 # calibration plots
 plt.rcParams["font.size"] = 10
 plt.rcParams["figure.figsize"] = (16, 6)
 plt.rcParams["figure.dpi"] = 100
 
 
+def detail_key(prod_config, period, run, stats, channel, parameter, plot_type) -> tuple:
+    """
+    Render cache key of a detailed plot. The plot directory of the production and
+    the stats of the plot shelves tell productions and reprocessed runs apart.
+    """
+    return (
+        period,
+        run,
+        str(prod_config["paths"]["plt"]),
+        stats,
+        channel,
+        parameter,
+        plot_type,
+    )
+
+
+def prefetch_detail(
+    prod_config, period, run, run_info, channel, parameter, plot_type, cache_data
+) -> None:
+    """
+    Split the plot entries of ``channel`` and render its detailed plot into the
+    render cache, as :meth:`CalMonitoring.view_details` would.
+    """
+    shelves = [
+        load_plot_shelf(prod_config, period, run, run_info, tier, cache_data)
+        for tier in ["hit", "dsp"]
+    ]
+    # entries not split yet are unpickled whole, figures included
+    with cal.detached_figures():
+        entries = [shelf.entry(channel[:9]) for shelf in shelves]
+    if cal.is_interactive(parameter, plot_type):
+        return
+    render_cache.get(
+        detail_key(
+            prod_config,
+            period,
+            run,
+            (shelves[0].stat, shelves[1].stat),
+            channel,
+            parameter,
+            plot_type,
+        ),
+        lambda: cal.detail_figure(*entries, parameter, plot_type),
+    )
+
+
 class CalMonitoring(GedMonitoring):
-    cached_data = param.Dict(default={"hit": {}, "dsp": {}})
+    # parameters of the runs, shared by all sessions and partitioned by period
+    cached_data = param.ClassSelector(
+        class_=LRUCache, default=par_cache, instantiate=False
+    )
     tmp_path = param.String("/tmp/")
     plot_type_tracking = param.ObjectSelector(
         default=list(cal.tracking_plots)[1],
@@ -48,6 +114,8 @@ class CalMonitoring(GedMonitoring):
         objects=["FWHM Qbb", "FWHM FEP", "A/E", "PZ", "Alpha"],
         default="FWHM Qbb",
     )
+    # whether the last detailed plot could not be shown
+    _details_failed = False
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -70,13 +138,9 @@ class CalMonitoring(GedMonitoring):
         self.param.watch(
             self.update_channel_plot_dict, ["channel"], precedence=2, queued=True
         )
+        # after the views of the new run are served
         self.param.watch(
-            self._clear_cached_data,
-            [
-                "period",
-            ],
-            precedence=1,
-            queued=True,
+            self.prefetch_neighbours, ["period", "run"], precedence=4, queued=True
         )
         self.param.watch(
             self.view_tracking,
@@ -90,6 +154,13 @@ class CalMonitoring(GedMonitoring):
             precedence=2,
             queued=True,
         )
+        # after the detailed plot of the new channel is served
+        self.param.watch(
+            self.prefetch_details,
+            ["run", "channel", "string"],
+            precedence=4,
+            queued=True,
+        )
 
     def download_summary_files(self, event=None):  # noqa: ARG002
         start_time = time.time()
@@ -138,11 +209,6 @@ class CalMonitoring(GedMonitoring):
         start_time = time.time()
         figure = None
         try:
-            if self.cached_data == {}:
-                self.cached_data = {
-                    "hit": {},
-                    "dsp": {},
-                }
             if self.plot_type_summary in [
                 "FWHM Qbb",
                 "FWHM FEP",
@@ -210,19 +276,13 @@ class CalMonitoring(GedMonitoring):
                     cache_data=self.cached_data,
                 )
             else:
-                figure = plt.figure()
+                with cal.pyplot_lock:
+                    figure = plt.figure()
         except BaseException:
             pass
         log.debug("Time to get summary plot:", extra={"time": time.time() - start_time})
         return figure
 
-    def _clear_cached_data(self, event=None):  # noqa: ARG002
-        """
-        Clear the cached data if the period changes.
-        """
-        self.cached_data["hit"] = {}
-        self.cached_data["dsp"] = {}
-
     def view_tracking(self, event=None):  # noqa: ARG002
         figure = None
         try:
@@ -249,24 +309,24 @@ class CalMonitoring(GedMonitoring):
                 )
         except BaseException:
             pass
+        log.debug("Parameter cache:", extra=self.cached_data.stats())
         return figure
 
     def update_plot_dict(self, event=None):  # noqa: ARG002
         start_time = time.time()
-        self.plot_dict = (
-            Path(self.prod_config["paths"]["plt"])
-            / f"hit/cal/{self.period}/{self.run}"
-            / f'{self.run_dict[self.run]["experiment"]}-{self.period}-{self.run}-cal-{self.run_dict[self.run]["timestamp"]}-plt_hit'
+        self.plot_dict = plot_file(
+            self.prod_config, self.period, self.run, self.run_dict[self.run]
         )
 
         # log.debug(self.run_dict)
         # log.debug(self.plot_dict)
-        with shelve.open(self.plot_dict, "r", protocol=pkl.HIGHEST_PROTOCOL) as shelf:
-            channels = list(shelf.keys())
-
-        with shelve.open(self.plot_dict, "r", protocol=pkl.HIGHEST_PROTOCOL) as shelf:
-            self.common_dict = shelf["common"]
-        channels.remove("common")
+        channels, self.common_dict = load_plot_index(
+            self.prod_config,
+            self.period,
+            self.run,
+            self.run_dict[self.run],
+            cache_data=self.cached_data,
+        )
         self.strings_dict, self.chan_dict, self.channel_map = sorter(
             self.base_path,
             self.run_dict[self.run]["timestamp"],
@@ -281,17 +341,49 @@ class CalMonitoring(GedMonitoring):
         self.update_channel_plot_dict()
         log.debug("Time to update plot dict:", extra={"time": time.time() - start_time})
 
+    def prefetch_neighbours(self, event=None):  # noqa: ARG002
+        """
+        Load the parameters and plot index of the previous and next run in the background.
+
+        The channel maps and statuses of all runs of the period are resolved too.
+        """
+        runs = list(self.run_dict)
+        if self.run not in runs:
+            return
+        idx = runs.index(self.run)
+        timestamps = [self.run_dict[run]["timestamp"] for run in runs]
+        tasks = [partial(self.sort_obj.load_runs, timestamps, system="cal")]
+        for run in runs[idx + 1 : idx + 2] + runs[max(idx - 1, 0) : idx]:
+            tasks += prefetch_run(
+                self.prod_config,
+                self.period,
+                run,
+                self.run_dict[run],
+                cache_data=self.cached_data,
+            )
+        prefetcher.submit(self, tasks)
+
     def update_channel_plot_dict(self, event=None):  # noqa: ARG002
         start_time = time.time()
         log.debug(self.channel)
-        with shelve.open(self.plot_dict, "r", protocol=pkl.HIGHEST_PROTOCOL) as shelf:
-            self.plot_dict_ch = shelf[self.channel[:9]]
-        with shelve.open(
-            str(self.plot_dict).replace("hit", "dsp"),
-            "r",
-            protocol=pkl.HIGHEST_PROTOCOL,
-        ) as shelf:
-            self.dsp_dict = shelf[self.channel[:9]]
+        stats = {}
+        for tier in ["hit", "dsp"]:
+            shelf = load_plot_shelf(
+                self.prod_config,
+                self.period,
+                self.run,
+                self.run_dict[self.run],
+                tier,
+                cache_data=self.cached_data,
+            )
+            with cal.detached_figures():
+                entry = shelf.entry(self.channel[:9])
+            stats[tier] = shelf.stat
+            if tier == "hit":
+                self.plot_dict_ch = entry
+            else:
+                self.dsp_dict = entry
+        self.plot_stats = (stats["hit"], stats["dsp"])
         log.debug(
             "Time to update channel plot dict:",
             extra={"time": time.time() - start_time},
@@ -309,69 +401,77 @@ class CalMonitoring(GedMonitoring):
         )
 
     def view_details(self, event=None):  # noqa: ARG002
-        fig_pane = pn.pane.Matplotlib(plt.figure(), sizing_mode="scale_width")
+        with cal.pyplot_lock:
+            fig_pane = pn.pane.Matplotlib(plt.figure(), sizing_mode="scale_width")
         try:
-            if self.parameter == "A/E":
-                fig = self.plot_dict_ch["aoe"][self.plot_type_details]
-                dummy = plt.figure()
-                new_manager = dummy.canvas.manager
-                new_manager.canvas.figure = fig
-                fig.set_canvas(new_manager.canvas)
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
-            elif self.parameter == "Baseline":
-                fig = self.plot_dict_ch["ecal"][self.plot_type_details]
-                dummy = plt.figure()
-                new_manager = dummy.canvas.manager
-                new_manager.canvas.figure = fig
-                fig.set_canvas(new_manager.canvas)
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
-            elif self.parameter == "PZ":
-                fig = self.dsp_dict["pz"][self.plot_type_details]
-                dummy = plt.figure()
-                new_manager = dummy.canvas.manager
-                new_manager.canvas.figure = fig
-                fig.set_canvas(new_manager.canvas)
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
-            elif self.parameter == "Optimisation":
-                fig = self.dsp_dict[
-                    f"{self.plot_type_details.split('_')[0]}_optimisation"
-                ][f"{self.plot_type_details.split('_')[1]}_space"]
-                dummy = plt.figure()
-                new_manager = dummy.canvas.manager
-                new_manager.canvas.figure = fig
-                fig.set_canvas(new_manager.canvas)
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
-            elif self.plot_type_details in {"spectrum", "logged_spectrum"}:
-                fig = cal.plot_spectrum(
-                    self.plot_dict_ch["ecal"][self.parameter]["spectrum"],
+            if cal.is_interactive(self.parameter, self.plot_type_details):
+                with cal.detached_figures():
+                    spectrum = self.plot_dict_ch["ecal"][self.parameter]["spectrum"]
+                fig_pane = cal.plot_spectrum(
+                    spectrum,
                     self.channel,
                     log=self.plot_type_details != "spectrum",
                 )
-                fig_pane = fig
-            elif self.plot_type_details == "survival_frac":
-                fig = cal.plot_survival_frac(
-                    self.plot_dict_ch["ecal"][self.parameter]["survival_frac"]
-                )
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
-            elif self.plot_type_details == "cut_spectrum":
-                fig = cal.plot_cut_spectra(
-                    self.plot_dict_ch["ecal"][self.parameter]["spectrum"]
-                )
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
-            elif self.plot_type_details == "peak_track":
-                fig = cal.track_peaks(self.plot_dict_ch["ecal"][self.parameter])
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
             else:
-                fig = self.plot_dict_ch["ecal"][self.parameter][self.plot_type_details]
-                dummy = plt.figure()
-                new_manager = dummy.canvas.manager
-                new_manager.canvas.figure = fig
-                fig.set_canvas(new_manager.canvas)
-                fig_pane = pn.pane.Matplotlib(fig, sizing_mode="scale_width")
+                # rendered once for all sessions
+                png = render_cache.get(
+                    detail_key(
+                        self.prod_config,
+                        self.period,
+                        self.run,
+                        self.plot_stats,
+                        self.channel,
+                        self.parameter,
+                        self.plot_type_details,
+                    ),
+                    lambda: cal.detail_figure(
+                        self.plot_dict_ch,
+                        self.dsp_dict,
+                        self.parameter,
+                        self.plot_type_details,
+                    ),
+                )
+                fig_pane = pn.pane.PNG(png, sizing_mode="scale_width")
+            self._details_failed = False
         except BaseException:
-            pass
+            self._details_failed = True
         return fig_pane
 
+    def prefetch_details(self, event=None):  # noqa: ARG002
+        """
+        Load and render the selected detailed plot of the other channels of the
+        string in the background, unless the plot of the channel failed.
+        """
+        if self._details_failed:
+            return
+        # shelve keys start with the channel, as matched in update_channel_plot_dict
+        objects = {channel[:9]: channel for channel in self.param["channel"].objects}
+        channels = []
+        for det in self.strings_dict.get(self.string, []):
+            try:
+                channel = objects.get(f"ch{self.channel_map[det]['daq']['rawid']}")
+            except (KeyError, TypeError):
+                continue
+            if channel is not None and channel != self.channel:
+                channels.append(channel)
+        prefetcher.submit(
+            (self, "details"),
+            [
+                partial(
+                    prefetch_detail,
+                    self.prod_config,
+                    self.period,
+                    self.run,
+                    self.run_dict[self.run],
+                    channel,
+                    self.parameter,
+                    self.plot_type_details,
+                    self.cached_data,
+                )
+                for channel in channels
+            ],
+        )
+
     def build_detailed_pane(self, widget_widths: int = 140):
         details_ch_param = pn.Param(
             self.param,
@@ -577,6 +677,14 @@ def run_dashboard_cal() -> None:
     args = argparser.parse_args()
 
     config = read_config(args.config_file)
+    cache_config = read_config(args.config_file, "cache")
+    configure_par_cache(cache_config)
+    configure_render_cache(cache_config)
+    configure_prefetcher(cache_config)
+    # parameter stores written by dashboard-ingest, split plots and renders,
+    # shared by all sessions
+    set_store_dir(CalMonitoring.tmp_path)
+    render_cache.set_dir(CalMonitoring.tmp_path)
     cal_panes = CalMonitoring.display_cal_panes(config.base, args.widget_widths)
     print("Starting Cal. Monitoring on port ", args.port)  # noqa: T201
     pn.serve(cal_panes, port=args.port, show=False)
@@ -6,6 +6,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 import plotly.graph_objects as go
 
+from legenddashboard.geds.cal.plot_shelf import detached_figures
+
 detailed_plots = [
     "2614_timemap",
     "peak_fits",
@@ -288,3 +290,49 @@ def track_peaks(plot_dict):
     plt.ylim([-1, 1])
     plt.close()
     return fig
+
+
+def is_interactive(parameter: str, plot_type: str) -> bool:
+    """Whether the detailed plot is an interactive plotly spectrum."""
+    return parameter not in {
+        "A/E",
+        "Baseline",
+        "PZ",
+        "Optimisation",
+    } and plot_type in {"spectrum", "logged_spectrum"}
+
+
+def detail_figure(plot_dict, dsp_dict, parameter: str, plot_type: str):
+    """
+    Matplotlib figure of a detailed plot from the ``plt_hit`` and ``plt_dsp``
+    entries of a channel.
+
+    The figure is built or unpickled in :func:`detached_figures`, so it can be
+    saved from any thread.
+    """
+    with detached_figures():
+        return _detail_figure(plot_dict, dsp_dict, parameter, plot_type)
+
+
+def _detail_figure(plot_dict, dsp_dict, parameter: str, plot_type: str):
+    if parameter == "A/E":
+        return plot_dict["aoe"][plot_type]
+    if parameter == "Baseline":
+        return plot_dict["ecal"][plot_type]
+    if parameter == "PZ":
+        return dsp_dict["pz"][plot_type]
+    if parameter == "Optimisation":
+        parts = plot_type.split("_")
+        return dsp_dict[f"{parts[0]}_optimisation"][f"{parts[1]}_space"]
+    builders = {
+        "survival_frac": lambda: plot_survival_frac(
+            plot_dict["ecal"][parameter]["survival_frac"]
+        ),
+        "cut_spectrum": lambda: plot_cut_spectra(
+            plot_dict["ecal"][parameter]["spectrum"]
+        ),
+        "peak_track": lambda: track_peaks(plot_dict["ecal"][parameter]),
+    }
+    if plot_type in builders:
+        return builders[plot_type]()
+    return plot_dict["ecal"][parameter][plot_type]
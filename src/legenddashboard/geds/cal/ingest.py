@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import h5py
+import msgpack
+import numpy as np
+from dbetto import Props
+
+from legenddashboard.geds.cal.plot_shelf import shelf_stat
+from legenddashboard.geds.cal.plot_store import convert_plot_shelf
+from legenddashboard.geds.cal.quantities import (
+    MISSING,
+    RunPars,
+    empty_columns,
+    lookup,
+    quantities,
+    tier_quantities,
+)
+from legenddashboard.util import gen_run_dict, read_config, snapshot_file
+
+log = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+
+
+def par_file(prod_config: dict, period: str, run: str, run_info: dict, tier="hit"):
+    """Location of the ``par_hit`` or ``par_dsp`` file of a calibration run."""
+    name = f"{run_info['experiment']}-{period}-{run}-cal-{run_info['timestamp']}"
+    return (
+        Path(prod_config["paths"][f"par_{tier}"])
+        / f"cal/{period}/{run}"
+        / f"{name}-par_{tier}.yaml"
+    )
+
+
+def plot_file(prod_config: dict, period: str, run: str, run_info: dict, tier="hit"):
+    """Location of the ``plt_hit`` or ``plt_dsp`` shelve of a calibration run."""
+    name = f"{run_info['experiment']}-{period}-{run}-cal-{run_info['timestamp']}"
+    return (
+        Path(prod_config["paths"]["plt"])
+        / f"{tier}/cal/{period}/{run}"
+        / f"{name}-plt_{tier}"
+    )
+
+
+def store_file(store_dir, prod_config: dict, period: str) -> Path:
+    """Location of the parameter store of a period."""
+    return snapshot_file(
+        store_dir, prod_config["paths"]["par_hit"], f"{period}-pars", suffix=".h5"
+    )
+
+
+def _source_stat(file):
+    try:
+        stat = Path(file).stat()
+    except OSError:
+        return (-1, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def ingest_period(store_dir, prod_config: dict, period: str, run_dict: dict) -> Path:
+    """
+    Write the parameter store of ``period`` with one row per run and detector.
+    """
+    file = store_file(store_dir, prod_config, period)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = file.with_name(f"{file.name}.{os.getpid()}")
+    runs = list(run_dict)
+    with h5py.File(tmp_file, "w") as f:
+        f.attrs["version"] = STORE_VERSION
+        f["runs"] = np.array(runs, dtype=h5py.string_dtype())
+        for tier in ["hit", "dsp"]:
+            names = tier_quantities(tier)
+            rows, dets, stats = [], [], []
+            values = {name: [] for name in names}
+            for i, run in enumerate(runs):
+                source = par_file(prod_config, period, run, run_dict[run], tier)
+                stats.append(_source_stat(source))
+                if stats[-1][0] < 0:
+                    log.warning("no %s parameters for %s %s", tier, period, run)
+                    continue
+                for det, det_pars in Props.read_from(source).items():
+                    rows.append(i)
+                    dets.append(det)
+                    for name in names:
+                        values[name].append(lookup(det_pars, quantities[name][1]))
+
+            group = f.create_group(tier)
+            group["run"] = np.array(rows, dtype=np.int32)
+            group["detector"] = np.array(dets, dtype=h5py.string_dtype())
+            group["source_stat"] = np.array(stats, dtype=np.int64).reshape(-1, 2)
+            for name in names:
+                kind = quantities[name][2]
+                present = np.array([v is not MISSING for v in values[name]], bool)
+                if kind == "float":
+                    column = np.full(len(rows), np.nan)
+                    for j, value in enumerate(values[name]):
+                        if value is MISSING:
+                            continue
+                        try:
+                            column[j] = float(value)
+                        except (TypeError, ValueError):
+                            log.debug("%s of %s is not a number", name, dets[j])
+                            present[j] = False
+                else:
+                    column = np.empty(len(rows), dtype=object)
+                    for j, value in enumerate(values[name]):
+                        column[j] = np.frombuffer(
+                            b"" if value is MISSING else msgpack.packb(value),
+                            dtype=np.uint8,
+                        )
+                quantity = group.create_group(f"quantities/{name}")
+                if kind == "float":
+                    quantity["value"] = column
+                else:
+                    quantity.create_dataset(
+                        "value",
+                        shape=(len(rows),),
+                        dtype=h5py.vlen_dtype(np.uint8),
+                        data=column,
+                    )
+                quantity["present"] = present
+    tmp_file.replace(file)
+    return file
+
+
+class PeriodStore:
+    """
+    Parameter store of a period held in memory.
+
+    :meth:`run_pars` returns the stored quantities of a run as :class:`RunPars`.
+    """
+
+    def __init__(self, file):
+        self.file = Path(file)
+        with h5py.File(self.file, "r") as f:
+            if f.attrs.get("version") != STORE_VERSION:
+                msg = f"unsupported parameter store version in {self.file}"
+                raise ValueError(msg)
+            self.runs = {run: i for i, run in enumerate(f["runs"].asstr()[()])}
+            self.tiers = {}
+            for tier in ["hit", "dsp"]:
+                group = f[tier]
+                columns = {}
+                for name in group["quantities"]:
+                    if name not in quantities:
+                        continue
+                    columns[name] = (
+                        group[f"quantities/{name}/value"][()],
+                        group[f"quantities/{name}/present"][()],
+                    )
+                self.tiers[tier] = {
+                    "run": group["run"][()],
+                    "detector": group["detector"].asstr()[()],
+                    "source_stat": group["source_stat"][()],
+                    "columns": columns,
+                }
+
+    def run_pars(self, run: str, tier="hit", source=None) -> RunPars | None:
+        """
+        Parameters of ``run`` keyed by detector, ``None`` if the store can not be used.
+
+        With ``source`` the store is only used if the par file is unchanged since
+        it was ingested or no longer exists.
+        """
+        if run not in self.runs:
+            return None
+        table = self.tiers[tier]
+        idx = self.runs[run]
+        stat = tuple(table["source_stat"][idx])
+        if stat[0] < 0:
+            return None
+        if source is not None:
+            current = _source_stat(source)
+            if current[0] >= 0 and current != stat:
+                return None
+
+        rows = np.flatnonzero(table["run"] == idx)
+        values, present = empty_columns(tier, len(rows))
+        for field, name in enumerate(values.dtype.names):
+            if name not in table["columns"]:
+                continue
+            column, column_present = table["columns"][name]
+            present[:, field] = column_present[rows]
+            if quantities[name][2] == "float":
+                values[name] = column[rows]
+                continue
+            for i, row in enumerate(rows):
+                if present[i, field]:
+                    values[name][i] = msgpack.unpackb(
+                        column[row].tobytes(), strict_map_key=False
+                    )
+        return RunPars(tier, table["detector"][rows], values, present)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(store_dir, prod_config: dict, period: str) -> PeriodStore | None:
+    """
+    Parameter store of ``period``, reloaded when the file changes.
+    """
+    file = store_file(store_dir, prod_config, period)
+    mtime = _source_stat(file)[0]
+    if mtime < 0:
+        return None
+    with _stores_lock:
+        cached = _stores.get(file)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, PeriodStore(file))
+            except (OSError, KeyError, ValueError):
+                log.warning("could not read parameter store %s", file)
+                return None
+            _stores[file] = cached
+    return cached[1]
+
+
+def convert_period_plots(
+    store_dir, prod_config: dict, period: str, run_dict: dict
+) -> list[Path]:
+    """
+    Convert the plot shelves of all runs of ``period`` to blob stores.
+    """
+    files = []
+    for run, run_info in run_dict.items():
+        for tier in ["hit", "dsp"]:
+            source = plot_file(prod_config, period, run, run_info, tier)
+            if shelf_stat(source) is None:
+                log.warning("no %s plots for %s %s", tier, period, run)
+                continue
+            files.append(convert_plot_shelf(store_dir, source))
+    return files
+
+
+def run_dashboard_ingest() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Ingest the calibration parameters into per period stores"
+    )
+    argparser.add_argument("config_file", type=str)
+    argparser.add_argument(
+        "-p", "--periods", nargs="*", default=None, help="periods, default all"
+    )
+    argparser.add_argument(
+        "-s",
+        "--store",
+        type=str,
+        default=None,
+        help="store directory, defaults to the tmp path of the config",
+    )
+    argparser.add_argument(
+        "--plots",
+        action="store_true",
+        help="also convert the plt_hit and plt_dsp shelves to blob stores",
+    )
+    args = argparser.parse_args()
+
+    config = read_config(args.config_file)
+    store_dir = args.store if args.store is not None else config.tmp
+    prod_config = Props.read_from(
+        Path(config.cal) / "dataflow-config.yaml", subst_pathvar=True
+    )
+    periods = gen_run_dict(config.cal)
+    for period in args.periods or list(periods):
+        start_time = time.time()
+        file = ingest_period(store_dir, prod_config, period, periods[period])
+        print(  # noqa: T201
+            f"{period}: {len(periods[period])} runs -> {file} "
+            f"({time.time() - start_time:.1f} s)"
+        )
+        if args.plots:
+            start_time = time.time()
+            files = convert_period_plots(
+                store_dir, prod_config, period, periods[period]
+            )
+            print(  # noqa: T201
+                f"{period}: {len(files)} plot shelves -> {store_dir} "
+                f"({time.time() - start_time:.1f} s)"
+            )
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+
+import msgpack
+from dbetto import Props
+
+from legenddashboard.geds.cal.ingest import open_store, par_file, plot_file
+from legenddashboard.geds.cal.plot_shelf import PlotShelf, shelf_stat
+from legenddashboard.geds.cal.plot_store import open_plot_store
+from legenddashboard.geds.cal.quantities import RunPars, project_pars
+from legenddashboard.prefetch import prefetcher
+from legenddashboard.util import LRUCache, snapshot_file
+
+log = logging.getLogger(__name__)
+
+# directory of the parameter stores written by dashboard-ingest and of the
+# msgpack copies of parsed par files
+store_dir = None
+
+
+# parsed parameters keyed by (period, tier, run), shared by all sessions
+par_cache = LRUCache()
+
+# seconds between checks of the par files of cached runs for changes
+revalidate_interval = 30.0
+_last_sweep = weakref.WeakKeyDictionary()
+# threads reading the par files of a period concurrently
+load_workers = 8
+_sweep_lock = threading.Lock()
+
+
+def configure_par_cache(config: dict) -> None:
+    """
+    Apply the ``cache`` section of the dashboard config.
+
+    ``par_mb`` is the budget in MB, ``revalidate_s`` the seconds between checks
+    of cached runs for reprocessed par files and ``load_workers`` the threads
+    reading the par files of a period.
+    """
+    global revalidate_interval, load_workers  # noqa: PLW0603
+    if "par_mb" in config:
+        par_cache.resize(int(float(config["par_mb"]) * 1024**2))
+    if "revalidate_s" in config:
+        revalidate_interval = float(config["revalidate_s"])
+    if "load_workers" in config:
+        load_workers = int(config["load_workers"])
+
+
+def set_store_dir(path) -> None:
+    global store_dir  # noqa: PLW0603
+    store_dir = path
+
+
+@lru_cache
+def get_prod_config(path) -> dict:
+    """``dataflow-config.yaml`` of the production at ``path``."""
+    return Props.read_from(Path(path) / "dataflow-config.yaml", subst_pathvar=True)
+
+
+def source_stat(file) -> tuple | None:
+    """``(mtime, size, inode)`` of a par file, ``None`` if it does not exist."""
+    try:
+        stat = Path(file).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def entry_stat(key: tuple, source) -> tuple | None:
+    """
+    Stat of the file the cache entry ``key`` was loaded from, plot shelves are
+    checked on their database file.
+    """
+    if key[1].startswith("plt_"):
+        return shelf_stat(source)
+    return source_stat(source)
+
+
+def revalidate(cache_data: LRUCache, force: bool = False) -> list:
+    """
+    Drop cached entries whose par file or plot shelve changed since it was loaded.
+
+    All entries are checked in one sweep, at most every :data:`revalidate_interval`
+    seconds unless ``force``. Returns the keys dropped.
+    """
+    now = time.monotonic()
+    with _sweep_lock:
+        last = _last_sweep.get(cache_data)
+        if not force and last is not None and now - last < revalidate_interval:
+            return []
+        _last_sweep[cache_data] = now
+    stale = [
+        key
+        for key, (source, stat, _) in cache_data.items()
+        if entry_stat(key, source) != stat
+    ]
+    for key in stale:
+        cache_data.discard(key)
+    if stale:
+        log.debug("reloading changed parameters of %s", stale)
+    return stale
+
+
+def read_par_file(file) -> dict:
+    """
+    Parsed par file, loaded from its msgpack copy if the file is unchanged.
+
+    The copy is keyed by path, size and mtime and written on the first read.
+    """
+    if store_dir is None:
+        return Props.read_from(file)
+    try:
+        stat = Path(file).stat()
+    except OSError:
+        return Props.read_from(file)
+    key = [str(file), stat.st_size, stat.st_mtime_ns]
+    copy = snapshot_file(store_dir, file, "par", suffix=".msgpack")
+    try:
+        with copy.open("rb") as f:
+            stored_key, data = msgpack.unpackb(f.read(), strict_map_key=False)
+        if stored_key == key:
+            return data
+    except (OSError, ValueError, msgpack.UnpackException):
+        pass
+
+    data = Props.read_from(file)
+    tmp_file = copy.with_name(f"{copy.name}.{os.getpid()}-{threading.get_ident()}")
+    try:
+        packed = msgpack.packb([key, data])
+        copy.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_file.open("wb") as f:
+            f.write(packed)
+        tmp_file.replace(copy)
+    except (OSError, TypeError, ValueError, OverflowError):
+        log.warning("could not write msgpack copy of %s", file)
+        tmp_file.unlink(missing_ok=True)
+    return data
+
+
+def load_pars(
+    prod_config: dict,
+    period: str,
+    run: str,
+    run_info: dict,
+    tier: str = "hit",
+    cache_data: LRUCache | None = None,
+) -> RunPars:
+    """
+    Parameters of a calibration run keyed by detector, projected onto the quantities
+    the views read.
+
+    Taken from ``cache_data``, the shared :data:`par_cache` by default, if present,
+    else from the parameter store of the period if it is up to date with the par
+    file, else read from the par file.
+    """
+    if cache_data is None:
+        cache_data = par_cache
+    revalidate(cache_data)
+    key = (period, tier, run)
+    entry = cache_data.get(key)
+    if entry is not None:
+        return entry[2]
+
+    source = par_file(prod_config, period, run, run_info, tier)
+    stat = source_stat(source)
+    pars = None
+    if store_dir is not None:
+        store = open_store(store_dir, prod_config, period)
+        if store is not None:
+            pars = store.run_pars(run, tier, source=source)
+    if pars is None:
+        log.debug("reading %s parameters of %s %s from %s", tier, period, run, source)
+        pars = project_pars(read_par_file(source), tier)
+
+    cache_data.put(key, (source, stat, pars), nbytes=pars.nbytes)
+    pars.on_grow = partial(cache_data.grow, key)
+    return pars
+
+
+def load_period_pars(
+    prod_config: dict,
+    period: str,
+    run_dict: dict,
+    tiers=("hit",),
+    cache_data: LRUCache | None = None,
+) -> None:
+    """
+    Load the parameters of all runs in ``run_dict`` missing from the cache.
+
+    The par files are read concurrently by up to :data:`load_workers` threads,
+    so that the following :func:`load_pars` calls are served from the cache.
+    """
+    if cache_data is None:
+        cache_data = par_cache
+    revalidate(cache_data)
+    missing = [
+        (run, tier)
+        for run in run_dict
+        for tier in tiers
+        if (period, tier, run) not in cache_data
+    ]
+    if len(missing) < 2:
+        return
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=min(load_workers, len(missing))) as pool:
+        list(
+            pool.map(
+                lambda item: load_pars(
+                    prod_config, period, item[0], run_dict[item[0]], item[1], cache_data
+                ),
+                missing,
+            )
+        )
+    log.debug(
+        "Time to load period parameters:", extra={"time": time.time() - start_time}
+    )
+
+
+def load_plot_shelf(
+    prod_config: dict,
+    period: str,
+    run: str,
+    run_info: dict,
+    tier: str = "hit",
+    cache_data: LRUCache | None = None,
+) -> PlotShelf:
+    """
+    ``plt_hit`` or ``plt_dsp`` shelve of a run, opened once and shared through
+    ``cache_data``. Read from its blob store in :data:`store_dir` if it was
+    converted by ``dashboard-ingest --plots``, else channel entries are split
+    into :data:`store_dir` in the background.
+    """
+    if cache_data is None:
+        cache_data = par_cache
+    revalidate(cache_data)
+    key = (period, f"plt_{tier}", run)
+    entry = cache_data.get(key)
+    if entry is None:
+        source = plot_file(prod_config, period, run, run_info, tier)
+        shelf = open_plot_store(store_dir, source) or PlotShelf(
+            source,
+            split_dir=store_dir,
+            submit=lambda task: prefetcher.submit(None, [task]),
+        )
+        entry = (source, shelf_stat(source), shelf)
+        cache_data.put(key, entry, nbytes=shelf.nbytes)
+    return entry[2]
+
+
+def load_plot_index(
+    prod_config: dict,
+    period: str,
+    run: str,
+    run_info: dict,
+    cache_data: LRUCache | None = None,
+) -> tuple[list, dict]:
+    """
+    Channels in the ``plt_hit`` shelve of a run and its ``common`` entry.
+    """
+    shelf = load_plot_shelf(prod_config, period, run, run_info, "hit", cache_data)
+    return list(shelf.channels), shelf.common
+
+
+def prefetch_run(
+    prod_config: dict,
+    period: str,
+    run: str,
+    run_info: dict,
+    cache_data: LRUCache | None = None,
+) -> list:
+    """
+    Tasks loading the parameters and plot shelves of a run into the cache.
+    """
+    return [
+        lambda: load_pars(prod_config, period, run, run_info, "hit", cache_data),
+        lambda: load_pars(prod_config, period, run, run_info, "dsp", cache_data),
+        lambda: load_plot_index(prod_config, period, run, run_info, cache_data),
+        lambda: load_plot_shelf(prod_config, period, run, run_info, "dsp", cache_data),
+    ]
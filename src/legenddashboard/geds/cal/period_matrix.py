@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from functools import lru_cache, partial
+
+import numexpr as ne
+import numpy as np
+from numexpr.necompiler import getExprNames
+
+from legenddashboard.geds.cal.pars import get_prod_config, load_pars, load_period_pars
+from legenddashboard.util import LRUCache
+
+log = logging.getLogger(__name__)
+
+residual_peaks = [2614.511, 583.191, 2103.511]
+
+
+def _value(path, det_pars):
+    for key in path:
+        det_pars = det_pars[key]
+    return det_pars
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> tuple:
+    """Compiled numexpr program of an expression and the names of its inputs."""
+    names = getExprNames(expression, {})[0]
+    program = ne.NumExpr(expression, signature=[(name, np.float64) for name in names])
+    return program, names
+
+
+def _grouped_inputs(expressions: list[str], variables: list[dict], skip=()):
+    """
+    Yield the compiled program, input names, entries and stacked inputs of each
+    distinct expression, inputs in ``skip`` are left to the caller.
+    """
+    groups = defaultdict(list)
+    for i, expression in enumerate(expressions):
+        groups[expression].append(i)
+    for expression, entries in groups.items():
+        try:
+            program, names = compile_expression(expression)
+        except (KeyError, SyntaxError, TypeError, ValueError):
+            log.debug("could not compile %s", expression)
+            continue
+        stacked = [name for name in names if name not in skip]
+        rows, inputs = [], []
+        for i in entries:
+            try:
+                inputs.append([float(variables[i][name]) for name in stacked])
+            except (KeyError, TypeError, ValueError):
+                continue
+            rows.append(i)
+        if not rows:
+            continue
+        columns = np.array(inputs, dtype=np.float64).reshape(len(rows), len(stacked)).T
+        yield program, names, rows, dict(zip(stacked, columns, strict=True))
+
+
+def evaluate_expressions(
+    expressions: list[str], variables: list[dict]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate ``expressions[i]`` with ``variables[i]`` for every ``i``.
+
+    Entries sharing an expression are evaluated together on stacked inputs, so
+    there is one call per distinct expression. Entries missing an input or with
+    non numeric inputs are NaN and flagged in the returned mask.
+    """
+    out = np.full(len(expressions), np.nan)
+    valid = np.zeros(len(expressions), dtype=bool)
+    for program, names, rows, columns in _grouped_inputs(expressions, variables):
+        out[rows] = program(*(columns[name] for name in names))
+        valid[rows] = True
+    return out, valid
+
+
+def _evaluate_at(program, names, columns, input_name, n, x):
+    inputs = dict(columns, **{input_name: np.broadcast_to(x, (n,))})
+    return program(*(np.ascontiguousarray(inputs[name]) for name in names))
+
+
+def invert_expressions(
+    expressions: list[str],
+    variables: list[dict],
+    target: float,
+    input_name: str = "cuspEmax_ctc",
+    start: float = 20000.0,
+    max_iter: int = 50,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Solve ``expressions[i] == target`` for ``input_name`` with ``variables[i]``.
+
+    Entries are grouped by expression as in :func:`evaluate_expressions`. The
+    expression is probed at 0, ``start`` and ``2 * start`` to get the
+    coefficients of a quadratic, whose root next to the linear solution is exact
+    for linear and quadratic calibrations. Entries where it does not reproduce
+    ``target`` are refined by damped Newton steps from there, or from ``start``.
+    """
+    out = np.full(len(expressions), np.nan)
+    valid = np.zeros(len(expressions), dtype=bool)
+    tolerance = 1e-9 * max(1.0, abs(target))
+    for program, names, rows, columns in _grouped_inputs(
+        expressions, variables, skip=(input_name,)
+    ):
+        if input_name not in names:
+            continue
+
+        curve = partial(_evaluate_at, program, names, columns, input_name, len(rows))
+        with np.errstate(all="ignore"):
+            f0, f1, f2 = curve(0.0), curve(start), curve(2 * start)
+            c2 = (f2 - 2 * f1 + f0) / (2 * start**2)
+            c1 = (f1 - f0) / start - c2 * start
+            d = target - f0
+            x = 2 * d / (c1 + np.copysign(np.sqrt(c1**2 + 4 * c2 * d), c1))
+            x = np.where(np.isfinite(x), x, start)
+            for _ in range(max_iter):
+                residual = curve(x) - target
+                done = np.abs(residual) <= tolerance
+                if done.all():
+                    break
+                h = 1e-6 * np.maximum(1.0, np.abs(x))
+                step = residual / ((curve(x + h) - curve(x - h)) / (2 * h))
+                # halve steps leaving the domain or not reducing the residual
+                for _ in range(max_iter):
+                    trial = np.where(done, x, x - step)
+                    worse = ~done & ~(np.abs(curve(trial) - target) < np.abs(residual))
+                    if not worse.any():
+                        break
+                    step = np.where(worse, step / 2, step)
+                x = trial
+            else:
+                done = np.abs(curve(x) - target) <= tolerance
+        out[rows] = np.where(done, x, np.nan)
+        valid[rows] = done
+    return out, valid
+
+
+def _calibration(det_pars) -> tuple[str, dict]:
+    hit_dict = det_pars["pars"]["operations"]["cuspEmax_ctc_cal"]
+    return hit_dict["expression"], dict(**hit_dict["parameters"])
+
+
+class Calibrated:
+    """
+    Tracking quantity given by the energy calibration of a detector at ``value``.
+
+    ``value(det_pars)`` is the uncalibrated input, or with ``reference`` the value
+    of that quantity for the detector in the first run having one. ``offset`` is
+    subtracted from the calibrated result.
+    """
+
+    def __init__(self, value=None, offset: float = 0, reference: str | None = None):
+        self.value = value
+        self.offset = offset
+        self.reference = reference
+
+    def variables(self, det_pars) -> tuple[str, dict]:
+        expression, parameters = _calibration(det_pars)
+        if self.value is not None:
+            parameters["cuspEmax_ctc"] = self.value(det_pars)
+        return expression, parameters
+
+
+class Inverted:
+    """
+    Tracking quantity given by the uncalibrated input at which the energy
+    calibration of a detector is ``target`` keV, see :func:`invert_expressions`.
+    """
+
+    def __init__(self, target: float):
+        self.target = target
+
+    def variables(self, det_pars) -> tuple[str, dict]:
+        return _calibration(det_pars)
+
+
+def _peak_mu(peak, det_pars):
+    return det_pars["results"]["ecal"]["cuspEmax_ctc_cal"]["pk_fits"][peak][
+        "parameters"
+    ]["mu"]
+
+
+def _tau(det_pars):
+    return float(det_pars["pz"]["tau1"][:-3])
+
+
+_aoe = ("results", "aoe", "1000-1300keV", 0)
+_ecal = ("results", "ecal", "cuspEmax_ctc_cal")
+
+# quantity -> (tier, function of the parameters of a detector raising KeyError
+# when they are missing, or a Calibrated or Inverted quantity evaluated in
+# batches), Inverted quantities are referenced before the Calibrated ones
+tracking_quantities = {
+    "qbb_adc": ("hit", Inverted(2039)),
+    # calibrated energy at the Qbb ADC value of the first run of the detector
+    "qbb_cal": ("hit", Calibrated(reference="qbb_adc")),
+    "fwhm_qbb": ("hit", partial(_value, (*_ecal, "eres_linear", "Qbb_fwhm_in_kev"))),
+    "fwhm_2614": ("hit", partial(_value, (*_ecal, "pk_fits", 2614.511, "fwhm_in_kev"))),
+    "aoe_mean": ("hit", partial(_value, (*_aoe, "mean"))),
+    "aoe_mean_err": ("hit", partial(_value, (*_aoe, "mean_err"))),
+    "aoe_res": ("hit", partial(_value, (*_aoe, "res"))),
+    "aoe_res_err": ("hit", partial(_value, (*_aoe, "res_err"))),
+    "aoe_low_cut": ("hit", partial(_value, ("results", "aoe", "low_cut"))),
+    "tau": ("dsp", _tau),
+    "ctc_alpha": (
+        "dsp",
+        partial(_value, ("ctc_params", "cuspEmax_ctc", "parameters", "a")),
+    ),
+}
+for _peak in residual_peaks:
+    tracking_quantities[f"residual_{_peak}"] = (
+        "hit",
+        Calibrated(partial(_peak_mu, _peak), offset=_peak),
+    )
+
+
+class PeriodMatrix:
+    """
+    Tracking quantities of one tier of a period as dense runs x detectors arrays.
+
+    All quantities of the tier are extracted in one pass over the runs, ``valid``
+    flags the cells whose parameters were found. Calibrated quantities of all
+    runs, detectors and peaks are evaluated together, see :func:`evaluate_expressions`,
+    after the inverted ones they reference, see :func:`invert_expressions`.
+    """
+
+    def __init__(
+        self,
+        prod_config: dict,
+        period: str,
+        run_dict: dict,
+        tier: str = "hit",
+        cache_data: LRUCache | None = None,
+    ):
+        start_time = time.time()
+        self.period = period
+        self.tier = tier
+        self.runs = list(run_dict)
+        self.times = np.array([run_dict[run]["timestamp"] for run in self.runs])
+
+        load_period_pars(prod_config, period, run_dict, [tier], cache_data)
+        self.sources = [
+            load_pars(prod_config, period, run, run_dict[run], tier, cache_data)
+            for run in self.runs
+        ]
+        self.columns = {}
+        for pars in self.sources:
+            for det in pars:
+                self.columns.setdefault(det, len(self.columns))
+
+        names = [
+            name for name, (q_tier, _) in tracking_quantities.items() if q_tier == tier
+        ]
+        shape = (len(self.runs), len(self.columns))
+        self.values = {name: np.full(shape, np.nan) for name in names}
+        self.valid = {name: np.zeros(shape, dtype=bool) for name in names}
+        # calibrated and inverted quantities are collected and evaluated per
+        # distinct expression
+        batches = {Calibrated: [], Inverted: []}
+        for i, pars in enumerate(self.sources):
+            for det in pars:
+                j = self.columns[det]
+                det_pars = pars[det]
+                for name in names:
+                    quantity = tracking_quantities[name][1]
+                    try:
+                        if isinstance(quantity, (Calibrated, Inverted)):
+                            expression, det_variables = quantity.variables(det_pars)
+                            batches[type(quantity)].append(
+                                (name, i, j, expression, det_variables)
+                            )
+                            continue
+                        self.values[name][i, j] = quantity(det_pars)
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    self.valid[name][i, j] = True
+
+        for name in dict.fromkeys(cell[0] for cell in batches[Inverted]):
+            cells = [cell for cell in batches[Inverted] if cell[0] == name]
+            results, valid = invert_expressions(
+                [cell[3] for cell in cells],
+                [cell[4] for cell in cells],
+                tracking_quantities[name][1].target,
+            )
+            self._fill(cells, results, valid)
+
+        cells = []
+        for name, i, j, expression, det_variables in batches[Calibrated]:
+            reference = tracking_quantities[name][1].reference
+            if reference is not None:
+                rows = np.flatnonzero(self.valid[reference][:, j])
+                if len(rows) == 0:
+                    continue
+                det_variables["cuspEmax_ctc"] = self.values[reference][rows[0], j]
+            cells.append((name, i, j, expression, det_variables))
+        results, valid = evaluate_expressions(
+            [cell[3] for cell in cells], [cell[4] for cell in cells]
+        )
+        self._fill(cells, results, valid)
+        self.nbytes = sum(v.nbytes for v in self.values.values()) + sum(
+            v.nbytes for v in self.valid.values()
+        )
+        log.debug(
+            "Time to build period matrix:", extra={"time": time.time() - start_time}
+        )
+
+    def _fill(self, cells, results, valid) -> None:
+        for (name, i, j, _, _), result, ok in zip(cells, results, valid, strict=True):
+            if ok:
+                quantity = tracking_quantities[name][1]
+                self.values[name][i, j] = result - getattr(quantity, "offset", 0)
+                self.valid[name][i, j] = True
+
+    def is_current(self, prod_config, run_dict, cache_data=None) -> bool:
+        """Whether the cached parameters of all runs are still the ones used."""
+        return all(
+            load_pars(
+                prod_config, self.period, run, run_dict[run], self.tier, cache_data
+            )
+            is source
+            for run, source in zip(self.runs, self.sources, strict=True)
+        )
+
+    def track(self, name: str, det: str, require=()) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Values of ``name`` for ``det`` and the timestamps of the runs having one.
+
+        Runs missing any of the ``require`` quantities are skipped as well.
+        """
+        j = self.columns.get(det)
+        if j is None:
+            return np.array([]), np.array([], dtype=self.times.dtype)
+        valid = self.valid[name][:, j].copy()
+        for other in require:
+            valid &= self.valid[other][:, j]
+        return self.values[name][valid, j], self.times[valid]
+
+    def column(self, name: str, det: str) -> np.ndarray:
+        """Values of ``name`` for ``det`` in every run, NaN where missing."""
+        j = self.columns.get(det)
+        if j is None:
+            return np.full(len(self.runs), np.nan)
+        return np.where(self.valid[name][:, j], self.values[name][:, j], np.nan)
+
+
+# period matrices keyed by (period, production, runs, tier)
+matrix_cache = LRUCache(max_bytes=256 * 1024**2)
+
+
+def get_period_matrix(
+    path, period: str, run_dict: dict, tier: str = "hit", cache_data=None
+) -> PeriodMatrix:
+    """
+    Period matrix of the runs in ``run_dict``, rebuilt when a run was reloaded.
+    """
+    prod_config = get_prod_config(path)
+    key = (period, str(path), tuple(run_dict), tier)
+    matrix = matrix_cache.get(key)
+    if matrix is None or not matrix.is_current(prod_config, run_dict, cache_data):
+        matrix = PeriodMatrix(prod_config, period, run_dict, tier, cache_data)
+        matrix_cache.put(key, matrix, nbytes=matrix.nbytes)
+    return matrix
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import dbm
+import hashlib
+import logging
+import os
+import pickle as pkl
+import shelve
+import struct
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from legenddashboard.util import estimate_nbytes, snapshot_file
+
+log = logging.getLogger(__name__)
+
+_header = struct.Struct("<Q")
+
+# held while figures are drawn through or unpickled into the pyplot state, which
+# the prefetch threads share with the serving threads
+pyplot_lock = threading.RLock()
+
+
+@contextmanager
+def detached_figures():
+    """
+    Hold :data:`pyplot_lock` and close the figures unpickled or drawn in the
+    block, they stay usable but are no longer kept by pyplot.
+    """
+    with pyplot_lock:
+        before = set(plt.get_fignums())
+        try:
+            yield
+        finally:
+            for num in set(plt.get_fignums()) - before:
+                plt.close(num)
+
+
+def shelf_stat(file) -> tuple | None:
+    """``(mtime, size)`` of the database file of a shelve, ``None`` if missing."""
+    for candidate in [file, f"{file}.db", f"{file}.dat"]:
+        try:
+            stat = Path(candidate).stat()
+        except OSError:
+            continue
+        return (stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+def _read_blob(file: Path, base: int, leaf: tuple):
+    offset, length = leaf
+    with file.open("rb") as f:
+        f.seek(base + offset)
+        return pkl.loads(f.read(length))
+
+
+class ShelfEntry(Mapping):
+    """
+    Lazy view of an entry split into sub-entries.
+
+    ``node`` is the nested index of the entry, its leaves are loaded with
+    ``load(leaf)`` in :func:`detached_figures` on first access and kept by the
+    view.
+    """
+
+    def __init__(self, load, node: dict):
+        self._load = load
+        self._node = node
+        self._loaded = {}
+
+    def __getitem__(self, key):
+        if key not in self._loaded:
+            child = self._node[key]
+            if isinstance(child, dict):
+                self._loaded[key] = ShelfEntry(self._load, child)
+            else:
+                with detached_figures():
+                    self._loaded[key] = self._load(child)
+        return self._loaded[key]
+
+    def __iter__(self):
+        return iter(self._node)
+
+    def __len__(self) -> int:
+        return len(self._node)
+
+
+class PlotShelf:
+    """
+    ``plt_hit`` or ``plt_dsp`` shelve of a calibration run.
+
+    Keeps the channel index and the ``common`` entry, the shelve is only opened
+    again to read a channel the first time, so cached shelves hold no files
+    open. With a ``split_dir`` the
+    sub-entries of a channel, e.g. ``ecal`` -> ``cuspEmax_ctc_cal``, are written
+    pickled separately to an indexed file after its first read, so later reads
+    of the channel load only the sub-entry shown. The files are written from the
+    raw shelve entry by ``submit(task)``, e.g. in the background. Their names
+    hold the version of the shelve, the split files of earlier versions are
+    removed the same way when it is opened.
+    """
+
+    def __init__(self, file, split_dir=None, submit=None):
+        self.file = Path(file)
+        self.split_dir = split_dir
+        self.submit = submit
+        self.stat = shelf_stat(file)
+        # tells the split files of this version of the shelve by name
+        self.version = hashlib.sha1(
+            repr([str(self.file), self.stat]).encode()
+        ).hexdigest()[:12]
+        self._lock = threading.Lock()
+        with shelve.open(str(file), "r") as shelf, detached_figures():
+            self.keys = list(shelf)
+            self.common = shelf["common"] if "common" in self.keys else None
+        self.channels = [key for key in self.keys if key != "common"]
+        # channel -> (start of the sub-entries, nested {key: (offset, length)})
+        # of its split file
+        self._index = {}
+        # channels whose split file is being written
+        self._splitting = set()
+        if split_dir is not None:
+            self._run(self._prune)
+
+    @property
+    def nbytes(self) -> int:
+        return estimate_nbytes(self.keys) + estimate_nbytes(self.common)
+
+    def _split_file(self, channel: str, version: str | None = None) -> Path:
+        version = self.version if version is None else version
+        return snapshot_file(self.split_dir, self.file, f"plt-{version}-{channel}")
+
+    def _run(self, task) -> None:
+        if self.submit is None:
+            task()
+        else:
+            self.submit(task)
+
+    def _read_header(self, file: Path) -> tuple | None:
+        try:
+            with file.open("rb") as f:
+                (length,) = _header.unpack(f.read(_header.size))
+                key, index = pkl.loads(f.read(length))
+        except (OSError, EOFError, ValueError, struct.error, pkl.UnpicklingError):
+            return None
+        return key, _header.size + length, index
+
+    def _prune(self) -> None:
+        """
+        Remove the split files written for other versions of the shelve, found
+        by name with a single listing of the split directory.
+        """
+        pattern = self._split_file("*", version="*")
+        current = self._split_file("", version=self.version).stem
+        for file in pattern.parent.glob(pattern.name):
+            if not file.name.startswith(current):
+                log.debug("removing stale split entry %s", file)
+                file.unlink(missing_ok=True)
+
+    def _read_index(self, channel: str) -> tuple | None:
+        header = self._read_header(self._split_file(channel))
+        if header is None or header[0] != [str(self.file), self.stat]:
+            return None
+        return header[1:]
+
+    def _write_split(self, channel: str, raw: bytes) -> tuple | None:
+        with detached_figures():
+            entry = pkl.loads(raw)
+        blobs, index, offset = [], {}, 0
+        for key, value in entry.items():
+            items = value.items() if isinstance(value, dict) else [(None, value)]
+            node = {} if isinstance(value, dict) else None
+            for sub_key, sub_value in items:
+                blob = pkl.dumps(sub_value, protocol=pkl.HIGHEST_PROTOCOL)
+                if node is None:
+                    index[key] = (offset, len(blob))
+                else:
+                    node[sub_key] = (offset, len(blob))
+                blobs.append(blob)
+                offset += len(blob)
+            if node is not None:
+                index[key] = node
+        header = pkl.dumps([[str(self.file), self.stat], index])
+        file = self._split_file(channel)
+        tmp_file = file.with_name(f"{file.name}.{os.getpid()}-{threading.get_ident()}")
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open("wb") as f:
+                f.write(_header.pack(len(header)))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+            tmp_file.replace(file)
+        except OSError:
+            log.warning("could not write split entry %s of %s", channel, self.file)
+            tmp_file.unlink(missing_ok=True)
+            return None
+        return _header.size + len(header), index
+
+    def _split(self, channel: str, raw: bytes) -> None:
+        try:
+            index = self._write_split(channel, raw)
+            if index is not None:
+                self._index[channel] = index
+        finally:
+            self._splitting.discard(channel)
+
+    def entry(self, channel: str) -> Mapping:
+        """
+        Entry of ``channel``, a :class:`ShelfEntry` once the entry was split.
+        """
+        index = self._index.get(channel)
+        if index is None and self.split_dir is not None:
+            index = self._read_index(channel)
+        if index is not None:
+            self._index[channel] = index
+            base, node = index
+            return ShelfEntry(
+                partial(_read_blob, self._split_file(channel), base), node
+            )
+
+        with dbm.open(str(self.file), "r") as db:
+            # shelve keys are utf-8 encoded
+            raw = db[channel.encode()]
+        with self._lock:
+            split = self.split_dir is not None and channel not in self._splitting
+            if split:
+                self._splitting.add(channel)
+        with detached_figures():
+            entry = pkl.loads(raw)
+        if split and isinstance(entry, dict):
+            self._run(partial(self._split, channel, raw))
+        elif split:
+            self._splitting.discard(channel)
+        return entry
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import io
+import logging
+import os
+import pickle as pkl
+import shelve
+import struct
+import threading
+from pathlib import Path
+
+import blosc2
+import numpy as np
+
+from legenddashboard.geds.cal.plot_shelf import (
+    ShelfEntry,
+    detached_figures,
+    shelf_stat,
+)
+from legenddashboard.util import estimate_nbytes, snapshot_file
+
+log = logging.getLogger(__name__)
+
+PLOT_STORE_VERSION = 1
+
+_header = struct.Struct("<Q")
+
+
+def plot_store_file(store_dir, source) -> Path:
+    """Location of the blob store converted from the plot shelve ``source``."""
+    return snapshot_file(store_dir, source, "plt", suffix=".b2")
+
+
+def _is_buffer(obj) -> bool:
+    return type(obj) is np.ndarray and not obj.dtype.hasobject
+
+
+class _SectionPickler(pkl.Pickler):
+    """Pickler moving numeric arrays out of the pickle into ``arrays``."""
+
+    def __init__(self, file, arrays: list):
+        super().__init__(file, protocol=pkl.HIGHEST_PROTOCOL)
+        self.arrays = arrays
+
+    def persistent_id(self, obj):
+        if _is_buffer(obj):
+            self.arrays.append(np.ascontiguousarray(obj))
+            return len(self.arrays) - 1
+        return None
+
+
+class _SectionUnpickler(pkl.Unpickler):
+    def __init__(self, file, load_array):
+        super().__init__(file)
+        self.load_array = load_array
+
+    def persistent_load(self, pid):
+        return self.load_array(pid)
+
+
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+        self.offset = 0
+
+    def write(self, data: bytes, typesize: int = 1) -> tuple[int, int]:
+        blob = blosc2.compress2(data, typesize=typesize)
+        self.f.write(blob)
+        offset, self.offset = self.offset, self.offset + len(blob)
+        return offset, len(blob)
+
+    def section(self, value) -> tuple:
+        arrays = []
+        buffer = io.BytesIO()
+        _SectionPickler(buffer, arrays).dump(value)
+        skeleton = self.write(buffer.getvalue())
+        buffers = [
+            (*self.write(array.tobytes(), array.itemsize), array.dtype.str, array.shape)
+            for array in arrays
+        ]
+        return skeleton, buffers
+
+
+def convert_plot_shelf(store_dir, source) -> Path:
+    """
+    Convert the plot shelve ``source`` to a blob store in ``store_dir``.
+
+    Each section of an entry, e.g. ``ecal`` -> ``cuspEmax_ctc_cal`` of a channel
+    or a channel of ``common``, is one blosc2 compressed pickle, in which numeric
+    arrays are replaced by separately compressed typed buffers.
+    """
+    file = plot_store_file(store_dir, source)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = file.with_name(f"{file.name}.{os.getpid()}-{threading.get_ident()}")
+    stat = shelf_stat(source)
+    index = {}
+    try:
+        with (
+            shelve.open(str(source), "r", protocol=pkl.HIGHEST_PROTOCOL) as shelf,
+            tmp_file.open("wb") as f,
+        ):
+            # the blobs are written first, the index is appended with its length
+            writer = _Writer(f)
+            for key in shelf:
+                entry = shelf[key]
+                if not isinstance(entry, dict):
+                    index[key] = writer.section(entry)
+                    continue
+                index[key] = {
+                    section: {sub: writer.section(v) for sub, v in value.items()}
+                    if isinstance(value, dict)
+                    else writer.section(value)
+                    for section, value in entry.items()
+                }
+            header = pkl.dumps(
+                {
+                    "version": PLOT_STORE_VERSION,
+                    "source": [str(source), stat],
+                    "index": index,
+                },
+                protocol=pkl.HIGHEST_PROTOCOL,
+            )
+            f.write(header)
+            f.write(_header.pack(len(header)))
+        tmp_file.replace(file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    return file
+
+
+class PlotStore:
+    """
+    Reader of a blob store written by :func:`convert_plot_shelf`.
+
+    Offers the interface of :class:`~legenddashboard.geds.cal.plot_shelf.PlotShelf`,
+    entries and ``common`` are lazy views loading one section at a time.
+    """
+
+    def __init__(self, file):
+        self.file = Path(file)
+        with self.file.open("rb") as f:
+            f.seek(-_header.size, os.SEEK_END)
+            (length,) = _header.unpack(f.read(_header.size))
+            f.seek(-_header.size - length, os.SEEK_END)
+            header = pkl.loads(f.read(length))
+        if header["version"] != PLOT_STORE_VERSION:
+            msg = f"{file} has version {header['version']}"
+            raise ValueError(msg)
+        self.source, self.stat = header["source"]
+        self._index = header["index"]
+        self.keys = list(self._index)
+        self.channels = [key for key in self.keys if key != "common"]
+
+    @property
+    def nbytes(self) -> int:
+        return estimate_nbytes(self._index)
+
+    def _load_section(self, section: tuple):
+        (offset, length), buffers = section
+        with self.file.open("rb") as f:
+
+            def load_array(i):
+                offset, length, dtype, shape = buffers[i]
+                array = np.empty(shape, dtype=dtype)
+                if array.nbytes > 0:
+                    f.seek(offset)
+                    blosc2.decompress2(f.read(length), dst=array)
+                return array
+
+            f.seek(offset)
+            skeleton = io.BytesIO(blosc2.decompress2(f.read(length)))
+            return _SectionUnpickler(skeleton, load_array).load()
+
+    def entry(self, key: str):
+        """Lazy view of the entry of ``key``."""
+        node = self._index[key]
+        if not isinstance(node, dict):
+            with detached_figures():
+                return self._load_section(node)
+        return ShelfEntry(self._load_section, node)
+
+    @property
+    def common(self):
+        return self.entry("common") if "common" in self._index else None
+
+
+def open_plot_store(store_dir, source) -> PlotStore | None:
+    """
+    Blob store of the plot shelve ``source``, ``None`` if it was not converted or
+    the shelve changed since.
+    """
+    if store_dir is None:
+        return None
+    file = plot_store_file(store_dir, source)
+    try:
+        store = PlotStore(file)
+    except (OSError, EOFError, KeyError, ValueError, pkl.UnpicklingError):
+        return None
+    if store.stat != shelf_stat(source):
+        log.debug("%s is older than %s", file, source)
+        return None
+    return store
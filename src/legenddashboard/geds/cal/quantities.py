@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from legenddashboard.util import estimate_nbytes
+
+energy_filters = ["cuspEmax_ctc_cal", "zacEmax_ctc_cal", "trapEmax_ctc_cal"]
+residual_peaks = [2614.511, 583.191, 2103.511]
+fitted_peaks = [583.191, 727.33, 860.564, 1592.511, 1620.5, 2103.511, 2614.511]
+
+# value of a quantity missing from the par file of a detector, by kind
+_defaults = {"float": np.nan, "object": None}
+
+
+def quantity_name(path: tuple) -> str:
+    """Column name of a parameter path, non string keys are shown as ``[key]``."""
+    return ".".join(key if isinstance(key, str) else f"[{key!r}]" for key in path)
+
+
+def _build_quantities() -> dict:
+    table = []
+    for filt in energy_filters:
+        ecal = ("results", "ecal", filt)
+        eres = (*ecal, "eres_linear")
+        table += [
+            ("hit", (*eres, "Qbb_fwhm_in_kev"), "float"),
+            ("hit", (*eres, "Qbb_fwhm_err_in_kev"), "float"),
+            ("hit", (*eres, "parameters", "a"), "float"),
+            ("hit", (*eres, "parameters", "b"), "float"),
+            ("hit", (*ecal, "pk_fits", 2614.511, "fwhm_in_kev"), "float"),
+            ("hit", (*ecal, "pk_fits", 2614.511, "fwhm_err_in_kev"), "float"),
+            ("hit", ("pars", "operations", filt, "expression"), "object"),
+            ("hit", ("pars", "operations", filt, "parameters"), "object"),
+        ]
+        for peak in residual_peaks:
+            table += [
+                ("hit", (*ecal, "pk_fits", peak, "parameters", "mu"), "float"),
+                ("hit", (*ecal, "pk_fits", peak, "uncertainties", "mu"), "float"),
+            ]
+    cusp = ("results", "ecal", "cuspEmax_ctc_cal")
+    table.append(("hit", (*cusp, "total_fep"), "float"))
+    table += [
+        ("hit", (*cusp, "pk_fits", peak, "validity"), "object") for peak in fitted_peaks
+    ]
+
+    aoe = ("results", "aoe")
+    # the A/E slice is keyed by 0 or "0" depending on the production
+    for key in [0, "0"]:
+        table += [
+            ("hit", (*aoe, "1000-1300keV", key, field), "float")
+            for field in ["mean", "mean_err", "res", "res_err"]
+        ]
+    table += [
+        ("hit", (*aoe, "correction_fit_results", "mean_fits", "pars"), "object"),
+        ("hit", (*aoe, "correction_fit_results", "n_of_valid_fits"), "float"),
+        ("hit", (*aoe, "low_cut"), "float"),
+        ("hit", (*aoe, "high_cut"), "float"),
+        ("hit", (*aoe, "low_side_sfs"), "object"),
+        ("hit", (*aoe, "2_side_sfs"), "object"),
+    ]
+
+    table.append(("dsp", ("pz", "tau1"), "object"))
+    table += [
+        ("dsp", ("ctc_params", param, "parameters", "a"), "float")
+        for param in ["trapEmax_ctc", "cuspEmax_ctc", "zacEmax_ctc"]
+    ]
+    return {
+        quantity_name(path): (tier, path, kind, _defaults[kind])
+        for tier, path, kind in table
+    }
+
+
+# quantity name -> (tier, path in the par file of a detector, kind, default where
+# missing), these are the only fields of the par files the calibration views read
+quantities = _build_quantities()
+
+MISSING = object()
+
+
+def lookup(pars, path):
+    """Value at ``path`` in nested parameters, :data:`MISSING` if absent."""
+    for key in path:
+        try:
+            pars = pars[key]
+        except (KeyError, TypeError, IndexError):
+            return MISSING
+    return pars
+
+
+class _Node:
+    __slots__ = ("children", "fields")
+
+    def __init__(self):
+        self.children = {}
+        self.fields = []
+
+
+def _build_tree(names: list[str]) -> _Node:
+    root = _Node()
+    for i, name in enumerate(names):
+        path = quantities[name][1]
+        node = root
+        node.fields.append(i)
+        for key in path[:-1]:
+            node = node.children.setdefault(key, _Node())
+            node.fields.append(i)
+        node.children[path[-1]] = i
+    return root
+
+
+def tier_quantities(tier: str) -> list[str]:
+    return [name for name, (q_tier, *_) in quantities.items() if q_tier == tier]
+
+
+_dtypes = {
+    tier: np.dtype(
+        [
+            (name, "f8" if quantities[name][2] == "float" else "O")
+            for name in tier_quantities(tier)
+        ]
+    )
+    for tier in ["hit", "dsp"]
+}
+_trees = {tier: _build_tree(list(dtype.names)) for tier, dtype in _dtypes.items()}
+
+
+class ParsView(Mapping):
+    """
+    Read-only nested view of the parameters of one detector in :class:`RunPars`.
+
+    Only keys with at least one stored quantity below them exist, so lookups
+    raise ``KeyError`` like the par file would for missing entries.
+    """
+
+    __slots__ = ("_node", "_pars", "_row")
+
+    def __init__(self, pars: RunPars, row: int, node: _Node):
+        self._pars = pars
+        self._row = row
+        self._node = node
+
+    def _has(self, child) -> bool:
+        present = self._pars.present[self._row]
+        if isinstance(child, _Node):
+            return bool(present[child.fields].any())
+        return bool(present[child])
+
+    def __getitem__(self, key):
+        child = self._node.children[key]
+        if not self._has(child):
+            raise KeyError(key)
+        if isinstance(child, _Node):
+            return ParsView(self._pars, self._row, child)
+        return self._pars.value(self._row, child)
+
+    def __iter__(self):
+        return (key for key, child in self._node.children.items() if self._has(child))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {
+            key: value.to_dict() if isinstance(value, ParsView) else value
+            for key, value in self.items()
+        }
+
+
+class RunPars(Mapping):
+    """
+    Parameters of the detectors of a run projected onto the declared quantities.
+
+    ``values`` is a NumPy record array with one row per detector and one field
+    per quantity of the tier, ``present`` flags which of them were in the par
+    file. ``run_pars[det]`` is a :class:`ParsView` laid out like the par file.
+    ``on_grow(nbytes)`` is called with the size of the data built lazily, so a
+    cache holding the parameters can count it.
+    """
+
+    _table = None
+    on_grow = None
+
+    def __init__(self, tier: str, detectors, values: np.ndarray, present: np.ndarray):
+        self.tier = tier
+        self.detectors = {det: i for i, det in enumerate(detectors)}
+        self.values = values
+        self.present = present
+        self._float = np.array(
+            [quantities[name][2] == "float" for name in values.dtype.names]
+        )
+        self.nbytes = values.nbytes + present.nbytes + estimate_nbytes(self.detectors)
+        for name in values.dtype.names:
+            if values.dtype[name] == object:
+                self.nbytes += sum(estimate_nbytes(value) for value in values[name])
+
+    def value(self, row: int, field: int):
+        value = self.values[row][field]
+        return float(value) if self._float[field] else value
+
+    def column(self, name: str) -> np.ndarray:
+        """Values of quantity ``name`` for all detectors, NaN where missing."""
+        field = self.values.dtype.names.index(name)
+        values = self.values[name].copy()
+        if self._float[field]:
+            values[~self.present[:, field]] = np.nan
+        return values
+
+    def table(self) -> pd.DataFrame:
+        """
+        All quantities of the run as columns indexed by detector, missing values
+        replaced by the default of the quantity. Built once per run.
+        """
+        if self._table is None:
+            columns = {}
+            for field, name in enumerate(self.values.dtype.names):
+                values = self.values[name].copy()
+                values[~self.present[:, field]] = quantities[name][3]
+                columns[name] = values
+            self._table = pd.DataFrame(
+                columns, index=pd.Index(list(self.detectors), name="detector")
+            )
+            # object values are shared with ``values``, only the columns count
+            nbytes = int(self._table.memory_usage(index=True).sum())
+            self.nbytes += nbytes
+            if self.on_grow is not None:
+                self.on_grow(nbytes)
+        return self._table
+
+    def __getitem__(self, det):
+        return ParsView(self, self.detectors[det], _trees[self.tier])
+
+    def __iter__(self):
+        return iter(self.detectors)
+
+    def __len__(self) -> int:
+        return len(self.detectors)
+
+
+def empty_columns(tier: str, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Record array of ``n`` rows for the quantities of ``tier`` and its presence mask.
+    """
+    dtype = _dtypes[tier]
+    values = np.zeros(n, dtype=dtype)
+    for name in dtype.names:
+        if dtype[name] == object:
+            values[name] = None
+    return values, np.zeros((n, len(dtype.names)), dtype=bool)
+
+
+def project_pars(pars: dict, tier: str = "hit") -> RunPars:
+    """
+    Keep only the declared quantities of parsed par file content.
+    """
+    values, present = empty_columns(tier, len(pars))
+    for row, det_pars in enumerate(pars.values()):
+        for field, name in enumerate(values.dtype.names):
+            _, path, kind, _ = quantities[name]
+            value = lookup(det_pars, path)
+            if value is MISSING:
+                continue
+            if kind == "float":
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+            values[name][row] = value
+            present[row, field] = True
+    return RunPars(tier, list(pars), values, present)
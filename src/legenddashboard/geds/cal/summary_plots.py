@@ -1,14 +1,12 @@
 # ruff: noqa: ARG001
 from __future__ import annotations
 
-import copy
 import logging
+from collections.abc import Mapping
 from datetime import datetime, timedelta
-from pathlib import Path
 
 import bokeh.palettes as pal
 import colorcet as cc
-import numexpr as ne
 import numpy as np
 import pandas as pd
 from bokeh.models import (
@@ -20,14 +18,113 @@ from bokeh.models import (
     ZoomOutTool,
 )
 from bokeh.plotting import figure
-from dbetto import Props
-from legendmeta import LegendMetadata
 
+from legenddashboard.geds.cal.pars import load_pars
+from legenddashboard.geds.cal.period_matrix import evaluate_expressions
+from legenddashboard.geds.cal.quantities import (
+    energy_filters,
+    fitted_peaks,
+    quantities,
+    quantity_name,
+    residual_peaks,
+)
 from legenddashboard.geds.string_visulization import create_detector_plot
 from legenddashboard.util import sorter
 
 log = logging.getLogger(__name__)
 
+# value and uncertainty of the energy resolutions, at Qbb or of the 2.6 MeV peak
+_resolution_keys = {
+    "Qbb": [("eres_linear", "Qbb_fwhm_in_kev"), ("eres_linear", "Qbb_fwhm_err_in_kev")],
+    "2.6": [
+        ("pk_fits", 2614.511, "fwhm_in_kev"),
+        ("pk_fits", 2614.511, "fwhm_err_in_kev"),
+    ],
+}
+
+
+def _ecal(filt: str, *keys) -> str:
+    return quantity_name(("results", "ecal", filt, *keys))
+
+
+def _aoe(*keys) -> str:
+    return quantity_name(("results", "aoe", *keys))
+
+
+def _operation(filt: str, key: str) -> str:
+    return quantity_name(("pars", "operations", filt, key))
+
+
+def _rows(table: pd.DataFrame, labels: list, names: list[str]) -> pd.DataFrame:
+    """
+    Columns ``names`` of a run table at ``labels``, labels which are not detectors
+    of the run hold the default of the quantity.
+    """
+    rows = table[names].reindex(labels)
+    missing = ~rows.index.isin(table.index)
+    for name in names:
+        if quantities[name][2] != "float":
+            rows.loc[missing, name] = quantities[name][3]
+    return rows
+
+
+def _string_rows(
+    table: pd.DataFrame, strings: dict, channel_map: dict, names: list[str]
+) -> pd.DataFrame:
+    """
+    Columns ``names`` of a run table with a row per string followed by its
+    detectors, in the order of the summary plots.
+    """
+    labels = []
+    for stri, channels in strings.items():
+        labels.append(stri)
+        labels += [channel_map[channel]["name"] for channel in channels]
+    return _rows(table, list(dict.fromkeys(labels)), names)
+
+
+def _calibrate(rows: pd.DataFrame, filt: str, values: np.ndarray) -> np.ndarray:
+    """Energy calibration ``filt`` of each row evaluated at ``values``."""
+    expressions = rows[_operation(filt, "expression")].to_numpy()
+    parameters = rows[_operation(filt, "parameters")].to_numpy()
+    valid = [
+        i
+        for i, (expression, pars) in enumerate(
+            zip(expressions, parameters, strict=True)
+        )
+        if isinstance(expression, str) and isinstance(pars, Mapping)
+    ]
+    input_name = filt.replace("_cal", "")
+    out = np.full(len(rows), np.nan)
+    out[valid] = evaluate_expressions(
+        [expressions[i] for i in valid],
+        [dict({input_name: values[i]}, **parameters[i]) for i in valid],
+    )[0]
+    return out
+
+
+def _sf(sfs, peak: float, field: str = "sf") -> float:
+    """Survival fraction of ``peak`` in an A/E result, NaN if missing."""
+    try:
+        return float(sfs[peak][field])
+    except (KeyError, TypeError, ValueError):
+        return np.nan
+
+
+def _tau_us(tau1) -> float:
+    """Pole zero constant in µs of a ``"<value>*ns"`` string, NaN if missing."""
+    try:
+        return float(tau1[:-3]) / 1000
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _has_value(values) -> bool:
+    """Whether any of ``values`` is a number other than NaN."""
+    try:
+        return not np.isnan(np.asarray(list(values), dtype=float)).all()
+    except (TypeError, ValueError):
+        return False
+
 
 def build_string_array(chan_map):
     dets = []
@@ -100,6 +197,8 @@ def plot_status(
         statuses = sort_dets_obj.statuses.valid_for(run_dict["timestamp"])
         cmap = sort_dets_obj.chmaps.valid_for(run_dict["timestamp"])
     else:
+        from legendmeta import LegendMetadata
+
         chmap = LegendMetadata(path=prod_config["paths"]["chan_map"])
         cmap = chmap.channelmap(run_dict["timestamp"])
         status_map = LegendMetadata(
@@ -181,34 +280,24 @@ def plot_counts(
     if sort_dets_obj is not None:
         cmap = sort_dets_obj.chmaps.valid_for(run_dict["timestamp"])
     else:
+        from legendmeta import LegendMetadata
+
         chmap = LegendMetadata(path=prod_config["paths"]["metadata"])
         cmap = chmap.channelmap(run_dict["timestamp"])
 
-    if cache_data is not None and run in cache_data["hit"]:
-        all_res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-        all_res = Props.read_from(path)
-        cache_data["hit"][run] = all_res
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
+    dets = [det for det in cmap if cmap[det].system == "geds"]
+    fep = _rows(table, dets, [_ecal("cuspEmax_ctc_cal", "total_fep")]).iloc[:, 0]
 
     res = {}
-    for det in cmap:
-        if cmap[det].system == "geds":
-            try:
-                fep_counts = all_res[det]["results"]["ecal"]["cuspEmax_ctc_cal"][
-                    "total_fep"
-                ]
-                mass = cmap[det]["production"]["mass_in_g"]
-                mass_in_kg = mass * 0.001
-                counts_per_kg = fep_counts / mass_in_kg  # calculate counts per kg
-                round_counts = round(counts_per_kg, 0)
-                res[det] = round_counts
-            except KeyError:
-                res[det] = 0
+    for det, fep_counts in fep.items():
+        try:
+            mass = cmap[det]["production"]["mass_in_g"]
+        except KeyError:
+            mass = np.nan
+        mass_in_kg = mass * 0.001
+        counts_per_kg = fep_counts / mass_in_kg  # calculate counts per kg
+        res[det] = 0 if np.isnan(counts_per_kg) else round(counts_per_kg, 0)
 
     display_dict = res
     ctitle = "FEP Counts per kg"
@@ -241,115 +330,14 @@ def plot_energy_resolutions(
         path, run_dict["timestamp"], key=key, sort_dets_obj=sort_dets_obj
     )
 
-    if cache_data is not None and run in cache_data["hit"]:
-        all_res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-
-        all_res = Props.read_from(path)
-        cache_data["hit"][run] = all_res
-
-    default = {
-        "cuspEmax_ctc_cal": {
-            "Qbb_fwhm": np.nan,
-            "Qbb_fwhm_err": np.nan,
-            "2.6_fwhm": np.nan,
-            "2.6_fwhm_err": np.nan,
-            "m0": np.nan,
-            "m1": np.nan,
-        },
-        "zacEmax_ctc_cal": {
-            "Qbb_fwhm": np.nan,
-            "Qbb_fwhm_err": np.nan,
-            "2.6_fwhm": np.nan,
-            "2.6_fwhm_err": np.nan,
-            "m0": np.nan,
-            "m1": np.nan,
-        },
-        "trapEmax_ctc_cal": {
-            "Qbb_fwhm": np.nan,
-            "Qbb_fwhm_err": np.nan,
-            "2.6_fwhm": np.nan,
-            "2.6_fwhm_err": np.nan,
-            "m0": np.nan,
-            "m1": np.nan,
-        },
-    }
-    res = {}
-    for stri in strings:
-        res[stri] = default
-        for channel in strings[stri]:
-            detector = channel_map[channel]["name"]
-            try:
-                det_dict = all_res[detector]["results"]["ecal"]
-                res[detector] = {
-                    "cuspEmax_ctc_cal": {
-                        "Qbb_fwhm": det_dict["cuspEmax_ctc_cal"]["eres_linear"][
-                            "Qbb_fwhm_in_kev"
-                        ],
-                        "Qbb_fwhm_err": det_dict["cuspEmax_ctc_cal"]["eres_linear"][
-                            "Qbb_fwhm_err_in_kev"
-                        ],
-                        "2.6_fwhm": det_dict["cuspEmax_ctc_cal"]["pk_fits"][2614.511][
-                            "fwhm_in_kev"
-                        ],
-                        "2.6_fwhm_err": det_dict["cuspEmax_ctc_cal"]["pk_fits"][
-                            2614.511
-                        ]["fwhm_err_in_kev"],
-                        "m0": det_dict["cuspEmax_ctc_cal"]["eres_linear"]["parameters"][
-                            "a"
-                        ],
-                        "m1": det_dict["cuspEmax_ctc_cal"]["eres_linear"]["parameters"][
-                            "b"
-                        ],
-                    },
-                    "zacEmax_ctc_cal": {
-                        "Qbb_fwhm": det_dict["zacEmax_ctc_cal"]["eres_linear"][
-                            "Qbb_fwhm_in_kev"
-                        ],
-                        "Qbb_fwhm_err": det_dict["zacEmax_ctc_cal"]["eres_linear"][
-                            "Qbb_fwhm_err_in_kev"
-                        ],
-                        "2.6_fwhm": det_dict["zacEmax_ctc_cal"]["pk_fits"][2614.511][
-                            "fwhm_in_kev"
-                        ],
-                        "2.6_fwhm_err": det_dict["zacEmax_ctc_cal"]["pk_fits"][
-                            2614.511
-                        ]["fwhm_err_in_kev"],
-                        "m0": det_dict["zacEmax_ctc_cal"]["eres_linear"]["parameters"][
-                            "a"
-                        ],
-                        "m1": det_dict["zacEmax_ctc_cal"]["eres_linear"]["parameters"][
-                            "b"
-                        ],
-                    },
-                    "trapEmax_ctc_cal": {
-                        "Qbb_fwhm": det_dict["trapEmax_ctc_cal"]["eres_linear"][
-                            "Qbb_fwhm_in_kev"
-                        ],
-                        "Qbb_fwhm_err": det_dict["trapEmax_ctc_cal"]["eres_linear"][
-                            "Qbb_fwhm_err_in_kev"
-                        ],
-                        "2.6_fwhm": det_dict["trapEmax_ctc_cal"]["pk_fits"][2614.511][
-                            "fwhm_in_kev"
-                        ],
-                        "2.6_fwhm_err": det_dict["trapEmax_ctc_cal"]["pk_fits"][
-                            2614.511
-                        ]["fwhm_err_in_kev"],
-                        "m0": det_dict["trapEmax_ctc_cal"]["eres_linear"]["parameters"][
-                            "a"
-                        ],
-                        "m1": det_dict["trapEmax_ctc_cal"]["eres_linear"]["parameters"][
-                            "b"
-                        ],
-                    },
-                }
-            except KeyError:
-                res[detector] = default
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
+    keys = _resolution_keys[at]
+    res = _string_rows(
+        table,
+        strings,
+        channel_map,
+        [_ecal(filt, *key) for filt in energy_filters for key in keys],
+    )
 
     p = figure(
         width=1400,
@@ -372,17 +360,19 @@ def plot_energy_resolutions(
     p.add_tools(zoom_in, zoom_out)
     # p.toolbar.active_drag = None      use this line to activate only hover and ywheel_zoom as active tool
 
-    label_res = [r if "String" not in r else "" for r in list(res)]
+    label_res = [r if "String" not in r else "" for r in res.index]
 
     df_plot = pd.DataFrame()
     df_plot["label_res"] = label_res
 
-    for filter_type in ["cuspEmax_ctc_cal", "zacEmax_ctc_cal", "trapEmax_ctc_cal"]:
+    averages = {}
+    for filter_type in energy_filters:
         x_plot, y_plot, y_plot_err = (
-            np.arange(1, len(list(res)) + 1, 1),
-            [res[det][filter_type][f"{at}_fwhm"] for det in res],
-            [res[det][filter_type][f"{at}_fwhm_err"] for det in res],
+            np.arange(1, len(res) + 1, 1),
+            res[_ecal(filter_type, *keys[0])].to_numpy(),
+            res[_ecal(filter_type, *keys[1])].to_numpy(),
         )
+        averages[filter_type] = np.nanmean(y_plot)
 
         err_xs = []
         err_ys = []
@@ -424,8 +414,8 @@ def plot_energy_resolutions(
                 color=filter_plot_color,
                 size=7,
                 line_alpha=0,
-                legend_label=f'{filter_name} Average: {np.nanmean([res[det][filter_type][f"{at}_fwhm"] for det in res]):.2f}keV',
-                name=f'{filter_name} Average: {np.nanmean([res[det][filter_type][f"{at}_fwhm"] for det in res]):.2f}keV',
+                legend_label=f"{filter_name} Average: {averages[filter_type]:.2f}keV",
+                name=f"{filter_name} Average: {averages[filter_type]:.2f}keV",
             )
         else:
             p.scatter(
@@ -435,16 +425,16 @@ def plot_energy_resolutions(
                 color=filter_plot_color,
                 size=7,
                 line_alpha=0,
-                legend_label=f'{filter_name} Average: {np.nanmean([res[det][filter_type][f"{at}_fwhm"] for det in res]):.2f}keV',
-                name=f'{filter_name} Average: {np.nanmean([res[det][filter_type][f"{at}_fwhm"] for det in res]):.2f}keV',
+                legend_label=f"{filter_name} Average: {averages[filter_type]:.2f}keV",
+                name=f"{filter_name} Average: {averages[filter_type]:.2f}keV",
             )
         p.multi_line(
             xs="err_xs_{}".format(filter_type.split("_")[0]),
             ys="err_ys_{}".format(filter_type.split("_")[0]),
             source=df_plot,
             color=filter_plot_color,
-            legend_label=f'{filter_name} Average: {np.nanmean([res[det][filter_type][f"{at}_fwhm"] for det in res]):.2f}keV',
-            name=f'{filter_name} Average: {np.nanmean([res[det][filter_type][f"{at}_fwhm"] for det in res]):.2f}keV',
+            legend_label=f"{filter_name} Average: {averages[filter_type]:.2f}keV",
+            name=f"{filter_name} Average: {averages[filter_type]:.2f}keV",
         )
 
     p.legend.location = "top_right"
@@ -461,14 +451,14 @@ def plot_energy_resolutions(
     p.yaxis.axis_label_text_font_size = "20px"
 
     p.xaxis.major_label_orientation = np.pi / 2
-    p.xaxis.ticker = np.arange(1, len(list(res)) + 1, 1)
+    p.xaxis.ticker = np.arange(1, len(res) + 1, 1)
     p.xaxis.major_label_overrides = {
         i: label_res[i - 1] for i in range(1, len(label_res) + 1, 1)
     }
     p.xaxis.major_label_text_font_style = "bold"
 
     for stri in strings:
-        loc = np.where(np.array(list(res)) == stri)[0][0]
+        loc = np.where(np.array(res.index) == stri)[0][0]
         string_span = Span(
             location=loc + 1, dimension="height", line_color="black", line_width=3
         )
@@ -556,70 +546,30 @@ def plot_energy_residuals(
         path, run_dict["timestamp"], key=key, sort_dets_obj=sort_dets_obj
     )
 
-    if cache_data is not None and run in cache_data["hit"]:
-        all_res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-
-        all_res = Props.read_from(path)
-        cache_data["hit"][run] = all_res
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
 
-    peaks = [2614.511, 583.191, 2103.511]
-    filters = ["cuspEmax_ctc_cal", "zacEmax_ctc_cal", "trapEmax_ctc_cal"]
+    peaks = residual_peaks
+    filters = energy_filters
+    names = []
+    for filt in filters:
+        names += [_operation(filt, "expression"), _operation(filt, "parameters")]
+        for peak in peaks:
+            names += [
+                _ecal(filt, "pk_fits", peak, "parameters", "mu"),
+                _ecal(filt, "pk_fits", peak, "uncertainties", "mu"),
+            ]
+    rows = _string_rows(table, strings, channel_map, names)
 
-    default_peaks = {f"{peak}": np.nan for peak in peaks}
-    default_peaks.update({f"{peak}_err": np.nan for peak in peaks})
-    default = {filt: default_peaks.copy() for filt in filters}
-    res = {}
-    for stri in strings:
-        res[stri] = copy.deepcopy(default)
-        for channel in strings[stri]:
-            detector = channel_map[channel]["name"]
-            res[detector] = copy.deepcopy(default)
-            try:
-                det_dict = all_res[detector]["results"]["ecal"]
-                for filt in filters:
-                    cal_dict = all_res[detector]["pars"]["operations"][filt]
-                    for peak in peaks:
-                        # try:
-                        cal_mu = ne.evaluate(
-                            f"{cal_dict['expression']}",
-                            local_dict=dict(
-                                {
-                                    filt.replace("_cal", ""): det_dict[filt]["pk_fits"][
-                                        peak
-                                    ]["parameters"]["mu"]
-                                },
-                                **cal_dict["parameters"],
-                            ),
-                        )
-                        cal_err = (
-                            ne.evaluate(
-                                f"{cal_dict['expression']}",
-                                local_dict=dict(
-                                    {
-                                        filt.replace("_cal", ""): det_dict[filt][
-                                            "pk_fits"
-                                        ][peak]["uncertainties"]["mu"]
-                                        + det_dict[filt]["pk_fits"][peak]["parameters"][
-                                            "mu"
-                                        ]
-                                    },
-                                    **cal_dict["parameters"],
-                                ),
-                            )
-                            - cal_mu
-                        )
-                        res[detector][filt][f"{peak}"] = cal_mu - peak
-                        res[detector][filt][f"{peak}_err"] = cal_err
-                        # except KeyError:
-                        #     pass
-            except KeyError:
-                pass
+    res = pd.DataFrame(index=rows.index)
+    for filt in filters:
+        for peak in peaks:
+            mu = rows[_ecal(filt, "pk_fits", peak, "parameters", "mu")].to_numpy()
+            mu_err = rows[_ecal(filt, "pk_fits", peak, "uncertainties", "mu")]
+            cal_mu = _calibrate(rows, filt, mu)
+            res[f"{filt}_{peak}"] = cal_mu - peak
+            res[f"{filt}_{peak}_err"] = (
+                _calibrate(rows, filt, mu + mu_err.to_numpy()) - cal_mu
+            )
 
     p = figure(
         width=1400,
@@ -640,7 +590,7 @@ def plot_energy_residuals(
     p.add_tools(zoom_in, zoom_out)
     # p.toolbar.active_drag = None      use this line to activate only hover and ywheel_zoom as active tool
 
-    label_res = [r if "String" not in r else "" for r in list(res)]
+    label_res = [r if "String" not in r else "" for r in res.index]
 
     df_plot = pd.DataFrame()
     df_plot["label_res"] = label_res
@@ -648,9 +598,9 @@ def plot_energy_residuals(
     for filter_type in filters:
         for peak in peaks:
             x_plot, y_plot, y_plot_err = (
-                np.arange(1, len(list(res)) + 1, 1),
-                [res[det][filter_type][f"{peak}"] for det in res],
-                [res[det][filter_type][f"{peak}_err"] for det in res],
+                np.arange(1, len(res) + 1, 1),
+                res[f"{filter_type}_{peak}"].to_numpy(),
+                res[f"{filter_type}_{peak}_err"].to_numpy(),
             )
 
             err_xs = []
@@ -684,8 +634,8 @@ def plot_energy_residuals(
                 color=peak_color,
                 size=7,
                 line_alpha=0,
-                legend_label=f'{peak} Average: {np.nanmean([res[det][filter_param][f"{peak}"] for det in res]):.2f}keV',
-                name=f'{peak} Average: {np.nanmean([res[det][filter_param][f"{peak}"] for det in res]):.2f}keV',
+                legend_label=f"{peak} Average: {np.nanmean(res[f'{filter_param}_{peak}']):.2f}keV",
+                name=f"{peak} Average: {np.nanmean(res[f'{filter_param}_{peak}']):.2f}keV",
             )
         else:
             p.scatter(
@@ -695,16 +645,16 @@ def plot_energy_residuals(
                 color=peak_color,
                 size=7,
                 line_alpha=0,
-                legend_label=f'{peak} Average: {np.nanmean([res[det][filter_param][f"{peak}"] for det in res]):.2f}keV',
-                name=f'{peak} Average: {np.nanmean([res[det][filter_param][f"{peak}"] for det in res]):.2f}keV',
+                legend_label=f"{peak} Average: {np.nanmean(res[f'{filter_param}_{peak}']):.2f}keV",
+                name=f"{peak} Average: {np.nanmean(res[f'{filter_param}_{peak}']):.2f}keV",
             )
         p.multi_line(
             xs=f"err_xs_{filter_type.split('_')[0]}_{int(peak)}",
             ys=f"err_ys_{filter_type.split('_')[0]}_{int(peak)}",
             source=df_plot,
             color=peak_color,
-            legend_label=f'{peak} Average: {np.nanmean([res[det][filter_param][f"{peak}"] for det in res]):.2f}keV',
-            name=f'{peak} Average: {np.nanmean([res[det][filter_param][f"{peak}"] for det in res]):.2f}keV',
+            legend_label=f"{peak} Average: {np.nanmean(res[f'{filter_param}_{peak}']):.2f}keV",
+            name=f"{peak} Average: {np.nanmean(res[f'{filter_param}_{peak}']):.2f}keV",
         )
 
     p.legend.location = "bottom_right"
@@ -716,14 +666,14 @@ def plot_energy_residuals(
     p.yaxis.axis_label_text_font_size = "20px"
 
     p.xaxis.major_label_orientation = np.pi / 2
-    p.xaxis.ticker = np.arange(1, len(list(res)) + 1, 1)
+    p.xaxis.ticker = np.arange(1, len(res) + 1, 1)
     p.xaxis.major_label_overrides = {
         i: label_res[i - 1] for i in range(1, len(label_res) + 1, 1)
     }
     p.xaxis.major_label_text_font_style = "bold"
 
     for stri in strings:
-        loc = np.where(np.array(list(res)) == stri)[0][0]
+        loc = np.where(np.array(res.index) == stri)[0][0]
         string_span = Span(
             location=loc + 1, dimension="height", line_color="black", line_width=3
         )
@@ -771,47 +721,31 @@ def plot_no_fitted_energy_peaks(
     if sort_dets_obj is not None:
         chmap = sort_dets_obj.chmaps.valid_for(run_dict["timestamp"])
     else:
+        from legendmeta import LegendMetadata
+
         cfg_file = prod_config["paths"]["chan_map"]
         configs = LegendMetadata(path=cfg_file)
         chmap = configs.channelmaps.on(run_dict["timestamp"])
     channels = [field for field in chmap if chmap[field]["system"] == "geds"]
 
     off_dets = [
-        chmap[field] for field in soft_dict if soft_dict[field]["processable"] is False
+        field for field in soft_dict if soft_dict[field]["processable"] is False
     ]
 
-    if cache_data is not None and run in cache_data["hit"]:
-        res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-
-        res = Props.read_from(path)
-        cache_data["hit"][run] = res
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
 
-    peaks = [583.191, 727.33, 860.564, 1592.511, 1620.5, 2103.511, 2614.511]
+    peaks = fitted_peaks
+    validity = _rows(
+        table,
+        channels,
+        [_ecal("cuspEmax_ctc_cal", "pk_fits", peak, "validity") for peak in peaks],
+    )
     grid = np.ones((len(peaks), len(channels)))
-    for i, channel in enumerate(channels):
-        idxs = np.zeros(len(peaks), dtype=bool)
-        try:
-            fitted_peaks = res[channel]["results"]["ecal"]["cuspEmax_ctc_cal"][
-                "pk_fits"
-            ]
-            fitted_peaks = [pk for pk in fitted_peaks if fitted_peaks["pk"]["validity"]]
-            if not isinstance(fitted_peaks, list):
-                fitted_peaks = [fitted_peaks]
-            for j, peak in enumerate(peaks):
-                if peak in fitted_peaks:
-                    idxs[j] = 1
-            if len(idxs) > 0:
-                grid[idxs, i] = 2
-
-        except KeyError:
-            if channel in off_dets:
-                grid[:, i] = 0
+    for i, (channel, valid) in enumerate(validity.iterrows()):
+        idxs = np.array([value is not None and bool(value) for value in valid])
+        grid[idxs, i] = 2
+        if not idxs.any() and channel in off_dets:
+            grid[:, i] = 0
 
     p = figure(
         width=1400,
@@ -894,6 +828,8 @@ def plot_aoe_status(
     if sort_dets_obj is not None:
         chmap = sort_dets_obj.chmaps.valid_for(run_dict["timestamp"])
     else:
+        from legendmeta import LegendMetadata
+
         cfg_file = prod_config["paths"]["chan_map"]
         configs = LegendMetadata(path=cfg_file)
         chmap = configs.channelmaps.on(run_dict["timestamp"])
@@ -903,63 +839,31 @@ def plot_aoe_status(
         field for field in soft_dict if soft_dict[field]["processable"] is False
     ]
 
-    if cache_data is not None and run in cache_data["hit"]:
-        res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-
-        res = Props.read_from(path)
-        cache_data["hit"][run] = res
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
 
     checks = ["Time_corr", "Energy_corr", "Cut_det", "Low_side_sfs", "2_side_sfs"]
+    slice_mean = [_aoe("1000-1300keV", key, "mean") for key in [0, "0"]]
+    mean_pars = _aoe("correction_fit_results", "mean_fits", "pars")
+    sfs_names = [_aoe("low_side_sfs"), _aoe("2_side_sfs")]
+    res = _rows(table, channels, [*slice_mean, mean_pars, _aoe("low_cut"), *sfs_names])
 
     grid = np.ones((len(checks), len(channels)))
-    for i, channel in enumerate(channels):
-        idxs = np.ones(len(checks), dtype=bool)
-        try:
-            aoe_dict = res[channel]["results"]["aoe"]
-            if not np.isnan(aoe_dict["1000-1300keV"]["0"]["mean"]):
-                idxs[0] = 1
-            if not (
-                np.isnan(
-                    np.array(
-                        [
-                            value
-                            for key, value in aoe_dict["correction_fit_results"][
-                                "mean_fits"
-                            ]["pars"].items()
-                        ]
-                    )
-                ).all()
-            ):
-                idxs[1] = 1
-            if not np.isnan(aoe_dict["low_cut"]):
-                idxs[2] = 1
-            if isinstance(aoe_dict["low_side_sfs"], float):
-                pass
-            else:
-                sfs = [
-                    float(dic["sf"]) for peak, dic in aoe_dict["low_side_sfs"].items()
-                ]
-                if not np.isnan(np.array(sfs)).all():
-                    idxs[3] = 1
-            if isinstance(aoe_dict["2_side_sfs"], float):
-                pass
-            else:
-                sfs = [float(dic["sf"]) for peak, dic in aoe_dict["2_side_sfs"].items()]
-                if not np.isnan(np.array(sfs)).all():
-                    idxs[4] = 1
-
-            if len(idxs) > 0:
-                grid[idxs, i] = 2
-
-        except KeyError:
-            if channel in off_dets:
-                grid[:, i] = 0
+    for i, (channel, aoe) in enumerate(res.iterrows()):
+        pars = aoe[mean_pars]
+        idxs = np.array(
+            [
+                _has_value(aoe[slice_mean]),
+                isinstance(pars, Mapping) and _has_value(pars.values()),
+                _has_value([aoe[_aoe("low_cut")]]),
+                *(
+                    isinstance(sfs, Mapping) and _has_value(_sf(sfs, pk) for pk in sfs)
+                    for sfs in aoe[sfs_names]
+                ),
+            ]
+        )
+        grid[idxs, i] = 2
+        if not idxs.any() and channel in off_dets:
+            grid[:, i] = 0
 
     p = figure(
         width=1400,
@@ -1040,29 +944,13 @@ def plot_no_fitted_aoe_slices(
         path, run_dict["timestamp"], key=key, sort_dets_obj=sort_dets_obj
     )
 
-    if cache_data is not None and run in cache_data["hit"]:
-        res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-
-        res = Props.read_from(path)
-        cache_data["hit"][run] = res
-
-    nfits = {}
-    for stri in strings:
-        nfits[stri] = np.nan
-        for channel in strings[stri]:
-            detector = channel_map[channel]["name"]
-            try:
-                nfits[detector] = res[channel]["results"]["aoe"][
-                    "correction_fit_results"
-                ]["n_of_valid_fits"]
-            except KeyError:
-                nfits[detector] = np.nan
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
+    nfits = _string_rows(
+        table,
+        strings,
+        channel_map,
+        [_aoe("correction_fit_results", "n_of_valid_fits")],
+    ).iloc[:, 0]
 
     p = figure(
         width=1400,
@@ -1083,13 +971,13 @@ def plot_no_fitted_aoe_slices(
     p.add_tools(zoom_in, zoom_out)
     # p.toolbar.active_drag = None      use this line to activate only hover and ywheel_zoom as active tool
 
-    label_res = [r if "String" not in r else "" for r in list(nfits)]
+    label_res = [r if "String" not in r else "" for r in nfits.index]
 
     df_plot = pd.DataFrame()
     df_plot["label_res"] = label_res
 
-    df_plot["x_nfits"] = np.arange(1, len(list(nfits)) + 1, 1)
-    df_plot["nfits"] = np.nan_to_num(list(nfits.values()))
+    df_plot["x_nfits"] = np.arange(1, len(nfits) + 1, 1)
+    df_plot["nfits"] = np.nan_to_num(nfits.to_numpy())
 
     filter_types = ["nfits"]
     filter_names = ["Valid. A/E fits"]
@@ -1129,14 +1017,14 @@ def plot_no_fitted_aoe_slices(
     p.yaxis.axis_label_text_font_size = "20px"
 
     p.xaxis.major_label_orientation = np.pi / 2
-    p.xaxis.ticker = np.arange(1, len(list(nfits)) + 1, 1)
+    p.xaxis.ticker = np.arange(1, len(nfits) + 1, 1)
     p.xaxis.major_label_overrides = {
         i: label_res[i - 1] for i in range(1, len(label_res) + 1, 1)
     }
     p.xaxis.major_label_text_font_style = "bold"
 
     for stri in strings:
-        loc = np.where(np.array(list(nfits)) == stri)[0][0]
+        loc = np.where(np.array(nfits.index) == stri)[0][0]
         string_span = Span(
             location=loc + 1, dimension="height", line_color="black", line_width=3
         )
@@ -1168,58 +1056,12 @@ def get_aoe_results(
         path, run_dict["timestamp"], key=key, sort_dets_obj=sort_dets_obj
     )
 
-    if cache_data is not None and run in cache_data["hit"]:
-        all_res = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_hit.yaml'
-        )
-
-        all_res = Props.read_from(path)
-        cache_data["hit"][run] = all_res
-
-    default = {
-        "A/E_Energy_param": "cuspEmax",
-        "Cal_energy_param": "cuspEmax_ctc",
-        "dt_param": "dt_eff",
-        "rt_correction": False,
-        "mean_pars": [np.nan, np.nan],
-        "sigma_pars": [np.nan, np.nan],
-        "low_cut": np.nan,
-        "high_cut": np.nan,
-        "low_side_sfs": {
-            1592.5: {"sf": np.nan, "sf_err": np.nan},
-            1620.5: {"sf": np.nan, "sf_err": np.nan},
-            2039.0: {"sf": np.nan, "sf_err": np.nan},
-            2103.53: {"sf": np.nan, "sf_err": np.nan},
-            2614.5: {"sf": np.nan, "sf_err": np.nan},
-        },
-        "2_side_sfs": {
-            1592.5: {"sf": np.nan, "sf_err": np.nan},
-            1620.5: {"sf": np.nan, "sf_err": np.nan},
-            2039.0: {"sf": np.nan, "sf_err": np.nan},
-            2103.53: {"sf": np.nan, "sf_err": np.nan},
-            2614.5: {"sf": np.nan, "sf_err": np.nan},
-        },
-    }
-
-    aoe_res = {}
-    for stri in strings:
-        aoe_res[stri] = default
-        for channel in strings[stri]:
-            detector = channel_map[channel]["name"]
-
-            try:
-                aoe_res[detector] = all_res[detector]["results"]["aoe"]
-                if len(aoe_res[detector]) == 0:
-                    raise KeyError
-            except KeyError:
-                aoe_res[detector] = default.copy()
-
-    # log.debug(aoe_res["V02160A"])
-    # log.debug(aoe_res["P00698B"])
+    table = load_pars(prod_config, period, run, run_dict, "hit", cache_data).table()
+    sfs = dict(
+        _string_rows(table, strings, channel_map, [_aoe("low_side_sfs")])
+        .iloc[:, 0]
+        .items()
+    )
 
     p = figure(
         width=1400,
@@ -1242,7 +1084,7 @@ def get_aoe_results(
     p.add_tools(zoom_in, zoom_out)
     # p.toolbar.active_drag = None      use this line to activate only hover and ywheel_zoom as active tool
 
-    label_res = [r if "String" not in r else "" for r in list(aoe_res)]
+    label_res = [r if "String" not in r else "" for r in list(sfs)]
 
     df_plot = pd.DataFrame()
     df_plot["label_res"] = label_res
@@ -1252,17 +1094,10 @@ def get_aoe_results(
     peak_colors = ["blue", "orange", "green", "red", "purple"]
 
     for peak_type in peak_types:
-        for det in aoe_res:
-            log.debug(det)
-            log.debug(aoe_res[det]["low_side_sfs"][peak_type]["sf"])
-        # try:
         x_plot, y_plot, y_plot_err = (
-            np.arange(1, len(list(aoe_res)) + 1, 1),
-            [float(aoe_res[det]["low_side_sfs"][peak_type]["sf"]) for det in aoe_res],
-            [
-                float(aoe_res[det]["low_side_sfs"][peak_type]["sf_err"])
-                for det in aoe_res
-            ],
+            np.arange(1, len(list(sfs)) + 1, 1),
+            [_sf(sfs[det], peak_type) for det in sfs],
+            [_sf(sfs[det], peak_type, "sf_err") for det in sfs],
         )
 
         err_xs = []
@@ -1328,14 +1163,14 @@ def get_aoe_results(
     p.yaxis.axis_label_text_font_size = "20px"
 
     p.xaxis.major_label_orientation = np.pi / 2
-    p.xaxis.ticker = np.arange(1, len(list(aoe_res)), 1)
+    p.xaxis.ticker = np.arange(1, len(list(sfs)), 1)
     p.xaxis.major_label_overrides = {
         i: label_res[i - 1] for i in range(1, len(label_res) + 1, 1)
     }
     p.xaxis.major_label_text_font_style = "bold"
 
     for stri in strings:
-        loc = np.where(np.array(list(aoe_res)) == stri)[0][0]
+        loc = np.where(np.array(list(sfs)) == stri)[0][0]
         string_span = Span(
             location=loc + 1, dimension="height", line_color="black", line_width=3
         )
@@ -1374,28 +1209,9 @@ def plot_pz_consts(
         path, run_dict["timestamp"], key=key, sort_dets_obj=sort_dets_obj
     )
 
-    if cache_data is not None and run in cache_data["dsp"]:
-        cal_dict = cache_data["hit"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_dsp"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_dsp.yaml'
-        )
-
-        cal_dict = Props.read_from(path)
-        cache_data["dsp"][run] = cal_dict
-
-    taus = {}
-
-    for stri in strings:
-        taus[stri] = np.nan
-        for channel in strings[stri]:
-            det = channel_map[channel]["name"]
-            try:
-                taus[det] = float(cal_dict[det]["pz"]["tau1"][:-3]) / 1000
-            except KeyError:
-                taus[det] = np.nan
+    table = load_pars(prod_config, period, run, run_dict, "dsp", cache_data).table()
+    tau1 = _string_rows(table, strings, channel_map, ["pz.tau1"]).iloc[:, 0]
+    taus = {det: _tau_us(value) for det, value in tau1.items()}
 
     p = figure(
         width=1400,
@@ -1536,42 +1352,19 @@ def plot_alpha(
         path, run_dict["timestamp"], key=key, sort_dets_obj=sort_dets_obj
     )
 
-    if cache_data is not None and run in cache_data["dsp"]:
-        cal_dict = cache_data["dsp"][run]
-    else:
-        file_path = Path(prod_config["paths"]["par_dsp"]) / f"cal/{period}/{run}"
-        path = (
-            file_path
-            / f'{run_dict["experiment"]}-{period}-{run}-cal-{run_dict["timestamp"]}-par_dsp.yaml'
-        )
-
-        cal_dict = Props.read_from(path)
-        cache_data["dsp"][run] = cal_dict
-
-    trap_alpha = {}
-    cusp_alpha = {}
-    zac_alpha = {}
-
-    for stri in strings:
-        trap_alpha[stri] = np.nan
-        cusp_alpha[stri] = np.nan
-        zac_alpha[stri] = np.nan
-        for channel in strings[stri]:
-            det = channel_map[channel]["name"]
-            try:
-                trap_alpha[det] = float(
-                    cal_dict[det]["ctc_params"]["trapEmax_ctc"]["parameters"]["a"]
-                )
-                cusp_alpha[det] = float(
-                    cal_dict[det]["ctc_params"]["cuspEmax_ctc"]["parameters"]["a"]
-                )
-                zac_alpha[det] = float(
-                    cal_dict[det]["ctc_params"]["zacEmax_ctc"]["parameters"]["a"]
-                )
-            except KeyError:
-                trap_alpha[det] = np.nan
-                cusp_alpha[det] = np.nan
-                zac_alpha[det] = np.nan
+    table = load_pars(prod_config, period, run, run_dict, "dsp", cache_data).table()
+    alpha = _string_rows(
+        table,
+        strings,
+        channel_map,
+        [
+            quantity_name(("ctc_params", param, "parameters", "a"))
+            for param in ["trapEmax_ctc", "cuspEmax_ctc", "zacEmax_ctc"]
+        ],
+    )
+    trap_alpha, cusp_alpha, zac_alpha = (
+        dict(column.items()) for _, column in alpha.items()
+    )
 
     p = figure(
         width=1400,
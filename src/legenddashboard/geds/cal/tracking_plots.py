@@ -1,13 +1,10 @@
 from __future__ import annotations
 
-import contextlib
 import datetime as dtt
 import warnings
 from datetime import datetime
-from pathlib import Path
 
 import colorcet as cc
-import numexpr as ne
 import numpy as np
 import pandas as pd
 from bokeh.models import (
@@ -20,53 +17,14 @@ from bokeh.models import (
     ZoomOutTool,
 )
 from bokeh.plotting import figure
-from dbetto import Props
-from scipy.optimize import minimize
 
+from legenddashboard.geds.cal.period_matrix import get_period_matrix
 from legenddashboard.util import sorter
 
 
 def plot_energy(path, run_dict, det, plot, colour, period, cache_data=None):
-    cals = []
-    times = []
-    qbb_adc = None
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["hit"]:
-            hit_pars_dict = cache_data["hit"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            hit_pars_file_path = (
-                Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-            )
-
-            hit_pars_path = (
-                Path(hit_pars_file_path)
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_hit.yaml'
-            )
-
-            hit_pars_dict = Props.read_from(hit_pars_path)
-            cache_data["hit"][run] = hit_pars_dict
-
-        try:
-            hit_dict = hit_pars_dict[det]["pars"]["operations"]["cuspEmax_ctc_cal"]
-            if qbb_adc is None:
-
-                def find_qbb_adc(val):
-                    return ne.evaluate(
-                        "abs(" + "cuspEmax_ctc*a +b" + "-2039)",
-                        local_dict=dict({"cuspEmax_ctc": val}, a=0.1, b=0),
-                    )
-
-                qbb_adc = minimize(find_qbb_adc, 20000)["x"][0]
-            out_data = ne.evaluate(
-                f"{hit_dict['expression']}",
-                local_dict=dict({"cuspEmax_ctc": qbb_adc}, **hit_dict["parameters"]),
-            )
-            cals.append(out_data)
-            times.append(run_dict[run]["timestamp"])
-        except KeyError:
-            pass
+    matrix = get_period_matrix(path, period, run_dict, "hit", cache_data)
+    cals, times = matrix.track("qbb_cal", det)
     if len(cals) > 0:
         cals = np.array(cals)
         plot.step(
@@ -93,42 +51,8 @@ def plot_energy(path, run_dict, det, plot, colour, period, cache_data=None):
 def plot_energy_res(
     path, run_dict, det, plot, colour, period, at="Qbb", cache_data=None
 ):
-    reses = []
-    times = []
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["hit"]:
-            hit_pars_dict = cache_data["hit"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-
-            hit_pars_file_path = (
-                Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-            )
-
-            hit_pars_path = (
-                hit_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_hit.yaml'
-            )
-
-            hit_pars_dict = Props.read_from(hit_pars_path)
-            cache_data["hit"][run] = hit_pars_dict
-        try:
-            if at == "Qbb":
-                reses.append(
-                    hit_pars_dict[det]["results"]["ecal"]["cuspEmax_ctc_cal"][
-                        "eres_linear"
-                    ]["Qbb_fwhm_in_kev"]
-                )
-            elif at == "2.6":
-                reses.append(
-                    hit_pars_dict[det]["results"]["ecal"]["cuspEmax_ctc_cal"][
-                        "pk_fits"
-                    ][2614.511]["fwhm_in_kev"]
-                )
-            times.append(run_dict[run]["timestamp"])
-        except KeyError:
-            pass
+    matrix = get_period_matrix(path, period, run_dict, "hit", cache_data)
+    reses, times = matrix.track({"Qbb": "fwhm_qbb", "2.6": "fwhm_2614"}[at], det)
 
     if len(reses) > 0:
         plot.step(
@@ -165,40 +89,10 @@ def plot_energy_res_2614(path, run_dict, det, plot, colour, period, cache_data=N
 
 
 def plot_aoe_mean(path, run_dict, det, plot, colour, period, cache_data=None):
-    means = []
-    mean_errs = []
-    reses = []
-    res_errs = []
-    times = []
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["hit"]:
-            hit_pars_dict = cache_data["hit"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            hit_pars_file_path = (
-                Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-            )
-
-            hit_pars_path = (
-                hit_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_hit.yaml'
-            )
-
-            hit_pars_dict = Props.read_from(hit_pars_path)
-            cache_data["hit"][run] = hit_pars_dict
-        try:
-            det_dict = hit_pars_dict[det]
-
-            means.append(det_dict["results"]["aoe"]["1000-1300keV"][0]["mean"])
-            mean_errs.append(det_dict["results"]["aoe"]["1000-1300keV"][0]["mean_err"])
-            reses.append(det_dict["results"]["aoe"]["1000-1300keV"][0]["res"])
-            res_errs.append(det_dict["results"]["aoe"]["1000-1300keV"][0]["res_err"])
-            times.append(run_dict[run]["timestamp"])
-        except KeyError:
-            continue
-    means = np.array(means)
-    reses = np.array(reses)
+    matrix = get_period_matrix(path, period, run_dict, "hit", cache_data)
+    require = ["aoe_mean", "aoe_mean_err", "aoe_res", "aoe_res_err"]
+    means, times = matrix.track("aoe_mean", det, require=require)
+    reses, _ = matrix.track("aoe_res", det, require=require)
     plot.step(
         [(datetime.strptime(value, "%Y%m%dT%H%M%SZ")) for value in times],
         100 * (means - means[0]) / reses,
@@ -260,45 +154,9 @@ def plot_aoe_mean(path, run_dict, det, plot, colour, period, cache_data=None):
 
 
 def plot_aoe_sig(path, run_dict, det, plot, colour, period, cache_data=None):
-    means = []
-    mean_errs = []
-    reses = []
-    res_errs = []
-    times = []
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["hit"]:
-            hit_pars_dict = cache_data["hit"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            hit_pars_file_path = (
-                Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-            )
-
-            hit_pars_path = (
-                hit_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_hit.yaml'
-            )
-
-            hit_pars_dict = Props.read_from(hit_pars_path)
-            cache_data["hit"][run] = hit_pars_dict
-
-        try:
-            means.append(
-                hit_pars_dict[det]["results"]["aoe"]["1000-1300keV"][0]["mean"]
-            )
-            mean_errs.append(
-                hit_pars_dict[det]["results"]["aoe"]["1000-1300keV"][0]["mean_err"]
-            )
-            reses.append(hit_pars_dict[det]["results"]["aoe"]["1000-1300keV"][0]["res"])
-            res_errs.append(
-                hit_pars_dict[det]["results"]["aoe"]["1000-1300keV"][0]["res_err"]
-            )
-            times.append(run_dict[run]["timestamp"])
-        except KeyError:
-            pass
-    means = np.array(means)
-    reses = np.array(reses)
+    matrix = get_period_matrix(path, period, run_dict, "hit", cache_data)
+    require = ["aoe_mean", "aoe_mean_err", "aoe_res", "aoe_res_err"]
+    reses, times = matrix.track("aoe_res", det, require=require)
     plot.step(
         [(datetime.strptime(value, "%Y%m%dT%H%M%SZ")) for value in times],
         (reses),
@@ -321,31 +179,8 @@ def plot_aoe_sig(path, run_dict, det, plot, colour, period, cache_data=None):
 
 
 def plot_aoe_cut(path, run_dict, det, plot, colour, period, cache_data=None):
-    cuts = []
-    times = []
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["hit"]:
-            hit_pars_dict = cache_data["hit"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            hit_pars_file_path = (
-                Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-            )
-
-            hit_pars_path = (
-                hit_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_hit.yaml'
-            )
-
-            hit_pars_dict = Props.read_from(hit_pars_path)
-            cache_data["hit"][run] = hit_pars_dict
-
-        with contextlib.suppress(KeyError):
-            cuts.append(hit_pars_dict[det]["results"]["aoe"]["low_cut"])
-            times.append(run_dict[run]["timestamp"])
-
-    cuts = np.array(cuts)
+    matrix = get_period_matrix(path, period, run_dict, "hit", cache_data)
+    cuts, times = matrix.track("aoe_low_cut", det)
     plot.step(
         [(datetime.strptime(value, "%Y%m%dT%H%M%SZ")) for value in times],
         (cuts),
@@ -368,31 +203,8 @@ def plot_aoe_cut(path, run_dict, det, plot, colour, period, cache_data=None):
 
 
 def plot_tau(path, run_dict, det, plot, colour, period, cache_data=None):
-    values = []
-    times = []
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["dsp"]:
-            dsp_pars_dict = cache_data["dsp"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            dsp_pars_file_path = (
-                Path(prod_config["paths"]["par_dsp"]) / f"cal/{period}/{run}"
-            )
-
-            dsp_pars_path = (
-                dsp_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_dsp.yaml'
-            )
-
-            dsp_pars_dict = Props.read_from(dsp_pars_path)
-            cache_data["dsp"][run] = dsp_pars_dict
-
-        with contextlib.suppress(KeyError):
-            values.append(float(dsp_pars_dict[det]["pz"]["tau1"][:-3]))
-            times.append(run_dict[run]["timestamp"])
-
-    values = np.array(values)
+    matrix = get_period_matrix(path, period, run_dict, "dsp", cache_data)
+    values, times = matrix.track("tau", det)
     plot.step(
         [(datetime.strptime(value, "%Y%m%dT%H%M%SZ")) for value in times],
         100 * (values - values[0]) / values[0],
@@ -415,32 +227,8 @@ def plot_tau(path, run_dict, det, plot, colour, period, cache_data=None):
 
 
 def plot_ctc_const(path, run_dict, det, plot, colour, period, cache_data=None):
-    values = []
-    times = []
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["dsp"]:
-            dsp_pars_dict = cache_data["dsp"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            dsp_pars_file_path = (
-                Path(prod_config["paths"]["par_dsp"]) / f"cal/{period}/{run}"
-            )
-            dsp_pars_path = (
-                dsp_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_dsp.yaml'
-            )
-
-            dsp_pars_dict = Props.read_from(dsp_pars_path)
-            cache_data["dsp"][run] = dsp_pars_dict
-
-        with contextlib.suppress(KeyError):
-            values.append(
-                dsp_pars_dict[det]["ctc_params"]["cuspEmax_ctc"]["parameters"]["a"]
-            )
-            times.append(run_dict[run]["timestamp"])
-
-    values = np.array(values)
+    matrix = get_period_matrix(path, period, run_dict, "dsp", cache_data)
+    values, times = matrix.track("ctc_alpha", det)
     plot.step(
         [(datetime.strptime(value, "%Y%m%dT%H%M%SZ")) for value in times],
         (values),
@@ -507,9 +295,6 @@ def plot_tracking(
 
     colours = cc.palette["glasbey_category10"][:100]
 
-    if cache_data is None or len(cache_data) == 0:
-        cache_data = {"hit": {}, "dsp": {}}
-
     for i, det in enumerate(string_dets[string]):
         # with contextlib.suppress(KeyError):
         plot_func(path, run_dict, det, p, colours[i], period, cache_data)
@@ -579,60 +364,19 @@ def plot_energy_residuals_period(
 
     res = {}
 
-    if cache_data is None or len(cache_data) == 0:
-        cache_data = {"hit": {}, "dsp": {}}
-
     for stri in strings:
         res[stri] = {peak: [] for peak in peaks}
         for detector in strings[stri]:
             res[detector] = {peak: [] for peak in peaks}
 
-    for run in run_dict:
-        if cache_data is not None and run in cache_data["hit"]:
-            hit_pars_dict = cache_data["hit"][run]
-        else:
-            prod_config = Path(path) / "dataflow-config.yaml"
-            prod_config = Props.read_from(prod_config, subst_pathvar=True)
-            hit_pars_file_path = (
-                Path(prod_config["paths"]["par_hit"]) / f"cal/{period}/{run}"
-            )
-
-            hit_pars_path = (
-                hit_pars_file_path
-                / f'{run_dict[run]["experiment"]}-{period}-{run}-cal-{run_dict[run]["timestamp"]}-par_hit.yaml'
-            )
-
-            hit_pars_dict = Props.read_from(hit_pars_path)
-            cache_data["hit"][run] = hit_pars_dict
-
-        for peak in peaks:
-            for stri in strings:
-                res[stri][peak].append(np.nan)
-                for detector in strings[stri]:
-                    try:
-                        hit_dict = hit_pars_dict[detector]["pars"]["operations"][
-                            "cuspEmax_ctc_cal"
-                        ]
-                        res_dict = hit_pars_dict[detector]["results"]["ecal"][
-                            "cuspEmax_ctc_cal"
-                        ]
-                        out_data = (
-                            ne.evaluate(
-                                f"{hit_dict['expression']}",
-                                local_dict=dict(
-                                    {
-                                        "cuspEmax_ctc": res_dict["pk_fits"][peak][
-                                            "parameters"
-                                        ]["mu"]
-                                    },
-                                    **hit_dict["parameters"],
-                                ),
-                            )
-                            - peak
-                        )
-                        res[detector][peak].append(out_data)
-                    except KeyError:
-                        continue
+    matrix = get_period_matrix(path, period, run_dict, "hit", cache_data)
+    for peak in peaks:
+        for stri in strings:
+            res[stri][peak] = [np.nan] * len(matrix.runs)
+            for detector in strings[stri]:
+                res[detector][peak] = list(
+                    matrix.track(f"residual_{peak}", detector)[0]
+                )
 
     # p = figure(width=1400, height=600, tools="pan,wheel_zoom,box_zoom,xzoom_in,xzoom_out,hover,reset,save")
     p = figure(
@@ -23,6 +23,9 @@ from legenddashboard.util import (
 
 log = logging.getLogger(__name__)
 
+# tabulator for the detector metadata table
+pn.extension("tabulator")
+
 meta_visu_plots_dict = {
     "Usability": visu.plot_visu_usability,
     "Processable": visu.plot_visu_processable,
@@ -103,8 +106,11 @@ class GedMonitoring(Monitoring):
         self.param["string"].objects = list(strings_dict)
         self.string = f"{next(iter(strings_dict))}"
         self.strings_dict = strings_dict
-        self.name_to_rawid = {k: int(v['daq']['rawid']) for k,v in self.channel_map.items()}
-        self.rawid_to_name = {int(v["daq"]["rawid"]): v["name"] for v in self.channel_map.values()}
+        channel_table = self.sort_obj.channel_table(
+            self.run_dict[self.run]["timestamp"], system="cal"
+        )
+        self.name_to_rawid = channel_table.name_to_rawid()
+        self.rawid_to_name = channel_table.rawid_to_name()
         log.debug("Time to update strings:", extra={"time": time.time() - start_time})
 
     def _get_metadata(self, event=None):  # noqa: ARG002
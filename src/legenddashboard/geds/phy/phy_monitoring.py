@@ -61,6 +61,16 @@ class PhyMonitoring(GedMonitoring):
     phy_data_sc = pd.DataFrame()
     phy_pane = pn.pane.Bokeh(figure(width=1000, height=600), sizing_mode="scale_width")
     _phy_sc_plotted = False
+
+    @staticmethod
+    def data_files(phy_path: str, period: str, run: str) -> list[str]:
+        """Geds and slow control HDF files of a run and the info of the geds one."""
+        run_path = os.path.join(phy_path, "generated/plt/hit/phy", period, run)
+        data_file = os.path.join(run_path, f"l200-{period}-{run}-phy-geds.hdf")
+        data_file_sc = os.path.join(
+            run_path, f"l200-{period}-{run}-phy-slow_control.hdf"
+        )
+        return [data_file, data_file_sc, data_file.replace(".hdf", "-info.yaml")]
     
     @param.depends(
         "run",
@@ -75,9 +85,9 @@ class PhyMonitoring(GedMonitoring):
     )
     def update_plots(self):
         start_time = time.time()
-        data_file = os.path.join(self.phy_path, "generated/plt/hit/phy", self.period, self.run, f"l200-{self.period}-{self.run}-phy-geds.hdf")
-        data_file_sc = os.path.join(self.phy_path, "generated/plt/hit/phy", self.period, self.run, f"l200-{self.period}-{self.run}-phy-slow_control.hdf")
-        data_info = data_file.replace(".hdf", "-info.yaml")
+        data_file, data_file_sc, data_info = self.data_files(
+            self.phy_path, self.period, self.run
+        )
 
         # Create empty plot inc case of errors
         p = figure(width=1000, height=600)
@@ -12,7 +12,6 @@ from bokeh.models import (
 )
 from bokeh.palettes import Category20, Turbo256
 from bokeh.plotting import figure
-from seaborn import color_palette
 
 # physics plots
 phy_plots_types_dict = {
@@ -77,6 +76,8 @@ def phy_plot_vsTime(
         source_high_res = ColumnDataSource(data_high_res)
         source_resampled = None
 
+    from seaborn import color_palette
+
     n_channels = len(data_string_mean.columns)
     colors = color_palette("hls", n_channels).as_hex()
 
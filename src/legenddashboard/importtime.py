@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from importlib.metadata import entry_points
+from pathlib import Path
+
+
+def entry_point_modules() -> dict[str, str]:
+    """
+    Modules of the ``legenddashboard`` console scripts keyed by script name.
+    """
+    return {
+        ep.name: ep.module
+        for ep in entry_points(group="console_scripts")
+        if ep.module.split(".")[0] == "legenddashboard"
+    }
+
+
+def measure_import(module: str) -> list[tuple[str, int, int]]:
+    """
+    Import ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Returns ``(module, self, cumulative)`` in microseconds for every module
+    imported, in the order reported by the interpreter.
+    """
+    ret = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out = []
+    for line in ret.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            # header line
+            continue
+        out.append((name.strip(), int(self_us), int(cumulative_us)))
+    return out
+
+
+def summarize(timings: list[tuple[str, int, int]]) -> dict:
+    """
+    Total import time and self time per top-level package, in milliseconds.
+    """
+    packages = defaultdict(int)
+    for name, self_us, _ in timings:
+        packages[name.split(".")[0]] += self_us
+    return {
+        "total": timings[-1][2] / 1000 if timings else 0.0,
+        "packages": {
+            package: self_us / 1000
+            for package, self_us in sorted(
+                packages.items(), key=lambda item: item[1], reverse=True
+            )
+        },
+    }
+
+
+def import_report(modules: list[str], repeat: int = 3) -> dict:
+    """
+    Import-time summary of each module, the fastest of ``repeat`` imports is kept.
+    """
+    report = {}
+    for module in modules:
+        runs = [summarize(measure_import(module)) for _ in range(repeat)]
+        report[module] = min(runs, key=lambda run: run["total"])
+    return report
+
+
+def print_report(report: dict, top: int = 10, baseline: dict | None = None):
+    for module, summary in report.items():
+        line = f"{module}: {summary['total']:.0f} ms"
+        if baseline is not None and module in baseline:
+            line += f" (baseline {baseline[module]['total']:.0f} ms)"
+        print(line)  # noqa: T201
+        for package, self_ms in list(summary["packages"].items())[:top]:
+            print(f"    {package:<30} {self_ms:8.1f} ms")  # noqa: T201
+
+
+def run_import_report() -> None:
+    argparser = argparse.ArgumentParser(
+        description=(
+            "Import time of the dashboard entry points from python -X importtime"
+        )
+    )
+    argparser.add_argument(
+        "modules",
+        nargs="*",
+        help="modules to import, defaults to the modules of all dashboard scripts",
+    )
+    argparser.add_argument("-n", "--top", type=int, default=10)
+    argparser.add_argument("-r", "--repeat", type=int, default=3)
+    argparser.add_argument("--save", type=str, help="write the report to a json file")
+    argparser.add_argument(
+        "--compare", type=str, help="json report to compare the totals against"
+    )
+    args = argparser.parse_args()
+
+    modules = args.modules or sorted(set(entry_point_modules().values()))
+    report = import_report(modules, repeat=args.repeat)
+
+    baseline = None
+    if args.compare is not None:
+        with Path(args.compare).open() as f:
+            baseline = json.load(f)
+    print_report(report, top=args.top, baseline=baseline)
+
+    if args.save is not None:
+        with Path(args.save).open("w") as f:
+            json.dump(report, f, indent=2)
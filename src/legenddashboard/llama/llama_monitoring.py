@@ -5,7 +5,6 @@ import logging
 import time
 from pathlib import Path
 
-import holoviews as hv
 import numpy as np
 import pandas as pd
 import panel as pn
@@ -20,11 +19,18 @@ log = logging.getLogger(__name__)
 class LlamaMonitoring(param.Parameterized):
     llama_path = param.String("")
 
+    @staticmethod
+    def data_files(llama_path: str) -> list[str]:
+        """Llama monitoring values."""
+        return [llama_path + "monivalues.txt"]
+
     def view_llama(self):
+        import holoviews as hv
+
         start_time = time.time()
         try:
             llama_data = pd.read_csv(
-                self.llama_path + "monivalues.txt",
+                self.data_files(self.llama_path)[0],
                 sep=r"\s+",
                 dtype={"timestamp": np.int64},
                 parse_dates=[1],
@@ -109,7 +115,7 @@ class LlamaMonitoring(param.Parameterized):
 
     def get_llama_lastUpdate(self):
         start_time = time.time()
-        llama_pathlib = Path(self.llama_path + "monivalues.txt")
+        llama_pathlib = Path(self.data_files(self.llama_path)[0])
         ret = "Last modified: {}".format(
             pd.to_datetime(llama_pathlib.stat().st_mtime, origin="unix", unit="s")
         )
@@ -19,6 +19,9 @@ from legenddashboard.util import logo_path, read_config
 
 log = logging.getLogger(__name__)
 
+# tabulator for the muon channel metadata table
+pn.extension("tabulator")
+
 
 class MuonMonitoring(Monitoring):
     muon_path = param.String("")
@@ -35,10 +38,24 @@ class MuonMonitoring(Monitoring):
     )
     data_dict = param.Dict({})
 
+    @staticmethod
+    def data_file(muon_path: str, period: str, run: str) -> str:
+        """Path of the dashboard shelve of a run, without the dbm suffixes."""
+        return (
+            f"{muon_path}/generated/plt/phy/{period}/dsp/{run}"
+            f"/dashboard_period_{period}_run_{run}.shelve"
+        )
+
+    @classmethod
+    def data_files(cls, muon_path: str, period: str, run: str) -> list[str]:
+        """Files of the dashboard shelve of a run."""
+        data_file = cls.data_file(muon_path, period, run)
+        return [f"{data_file}.dat", f"{data_file}.dir"]
+
     @param.depends("run", watch=True)
     def _get_muon_data(self):
         start_time = time.time()
-        data_file = f"{self.muon_path}/generated/plt/phy/{self.period}/dsp/{self.run}/dashboard_period_{self.period}_run_{self.run}.shelve"
+        data_file = self.data_file(self.muon_path, self.period, self.run)
         if not (Path(data_file) / ".dat").exists():
             self.muon_data_dict = {}
         else:
@@ -67,7 +84,7 @@ class MuonMonitoring(Monitoring):
             return p
 
         if self.muon_plots_cal == "Cal. SPP Shift":
-            data_file = f"{self.muon_path}/generated/plt/phy/{self.period}/dsp/{self.run}/dashboard_period_{self.period}_run_{self.run}.shelve"
+            data_file = self.data_file(self.muon_path, self.period, self.run)
             with shelve.open(data_file, "r") as f:
                 # x_data_str = np.array(list(f['date'].values()))
                 x_data_str = np.array(list(f["date"].values()))
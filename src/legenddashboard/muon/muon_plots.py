@@ -14,6 +14,9 @@ from bokeh.plotting import figure
 
 log = logging.getLogger(__name__)
 
+# somehow TUM server needs Agg -> needs fix in the future
+mpl.use("Agg")
+
 PMT_ID = [
     "101 Pillbox",
     "704 Pillbox",
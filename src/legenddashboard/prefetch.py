@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Pool of background threads running prefetch tasks, one batch per owner.
+
+    Submitting a new batch for an owner, e.g. a dashboard session, drops its
+    pending tasks so only the latest neighbourhood is loaded, tasks submitted
+    without owner are always run. Up to ``workers`` tasks run at the same time.
+    Failing tasks are logged and ignored, the data is then loaded on demand as
+    before.
+    """
+
+    def __init__(self, workers: int = 4, niceness: int = 10):
+        self.workers = workers
+        self.niceness = niceness
+        self._tasks = deque()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def resize(self, workers: int) -> None:
+        """Change the number of threads, surplus threads exit once idle."""
+        with self._cond:
+            self.workers = workers
+            self._cond.notify_all()
+
+    def submit(self, owner, tasks: list) -> None:
+        with self._cond:
+            self._tasks = deque(
+                (task_owner, task)
+                for task_owner, task in self._tasks
+                if owner is None or task_owner != owner
+            )
+            self._tasks.extend((owner, task) for task in tasks)
+            while len(self._threads) < min(self.workers, len(self._tasks)):
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"dashboard-prefetch-{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify(len(tasks))
+
+    def _run(self) -> None:
+        # lower the priority of this thread only, the serving threads keep theirs
+        with contextlib.suppress(AttributeError, OSError):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.niceness)
+        while True:
+            with self._cond:
+                while not self._tasks and len(self._threads) <= self.workers:
+                    self._cond.wait()
+                if len(self._threads) > self.workers:
+                    self._threads.remove(threading.current_thread())
+                    return
+                _, task = self._tasks.popleft()
+            start_time = time.time()
+            try:
+                task()
+            except Exception:
+                log.debug("prefetch task failed", exc_info=True)
+            log.debug("Time to prefetch:", extra={"time": time.time() - start_time})
+
+
+# shared by all sessions of the process
+prefetcher = Prefetcher()
+
+
+def configure_prefetcher(config: dict) -> None:
+    """Apply ``prefetch_workers`` of the ``cache`` section of the dashboard config."""
+    if "prefetch_workers" in config:
+        prefetcher.resize(int(config["prefetch_workers"]))
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+from legenddashboard.util import LRUCache
+
+log = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """
+    Matplotlib figures rendered to PNG bytes, shared by all sessions.
+
+    Renders are kept in a memory LRU backed by a directory bounded by
+    ``disk_bytes``. Keys are tuples starting with a partition like
+    :class:`~legenddashboard.util.LRUCache`, a figure is rendered at most once per
+    key even when sessions request it concurrently.
+    """
+
+    def __init__(
+        self, max_bytes: int = 128 * 1024**2, disk_bytes: int = 1024**3, dpi=144
+    ):
+        self.memory = LRUCache(max_bytes)
+        self.disk_bytes = disk_bytes
+        self.dpi = dpi
+        self.cache_dir = None
+        # bytes of the renders on disk, as of the last scan plus the writes since
+        self._disk_total = None
+        self._locks = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def set_dir(self, path) -> None:
+        self.cache_dir = None if path is None else Path(path) / "legend-dashboard"
+        with self._lock:
+            self._disk_total = None
+
+    def _file(self, key) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return self.cache_dir / "renders" / f"{digest}.png"
+
+    def _read(self, key) -> bytes | None:
+        file = self._file(key)
+        if file is None:
+            return None
+        try:
+            data = file.read_bytes()
+            os.utime(file)
+        except OSError:
+            return None
+        return data
+
+    def _write(self, key, data: bytes) -> None:
+        file = self._file(key)
+        if file is None:
+            return
+        tmp_file = file.with_name(f"{file.name}.{os.getpid()}-{threading.get_ident()}")
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file.write_bytes(data)
+            tmp_file.replace(file)
+        except OSError:
+            log.warning("could not write render %s", file)
+            tmp_file.unlink(missing_ok=True)
+            return
+        with self._lock:
+            if self._disk_total is not None:
+                self._disk_total += len(data)
+                if self._disk_total <= self.disk_bytes:
+                    return
+            self._disk_total = self._prune(file.parent)
+
+    def _prune(self, directory: Path) -> int:
+        """
+        Remove the least recently used renders once over :attr:`disk_bytes`, down
+        to 90% of it, returns the bytes left. Only run on the first write and once
+        the running total of the writes goes over the budget.
+        """
+        files = []
+        for file in directory.glob("*.png"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, file))
+        total = sum(size for _, size, _ in files)
+        if total <= self.disk_bytes:
+            return total
+        # leave some room so the next scan is not on the next write
+        for _, size, file in sorted(files):
+            if total <= self.disk_bytes * 0.9:
+                break
+            file.unlink(missing_ok=True)
+            total -= size
+        return total
+
+    def render(self, fig) -> bytes:
+        buffer = io.BytesIO()
+        fig.savefig(
+            buffer,
+            format="png",
+            dpi=self.dpi,
+            facecolor=fig.get_facecolor(),
+            edgecolor=fig.get_edgecolor(),
+        )
+        return buffer.getvalue()
+
+    def get(self, key, figure) -> bytes:
+        """
+        PNG of the figure returned by ``figure()``, only called if ``key`` is not
+        cached in memory or on disk. The figure must be detached from pyplot, it
+        is saved without holding any pyplot lock.
+        """
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+        # dropped once no thread holds or waits for it
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+        with lock:
+            data = self.memory.get(key)
+            if data is None:
+                data = self._read(key)
+            if data is None:
+                start_time = time.time()
+                data = self.render(figure())
+                log.debug(
+                    "Time to render figure:",
+                    extra={"time": time.time() - start_time},
+                )
+                self._write(key, data)
+            self.memory.put(key, data, nbytes=len(data))
+        return data
+
+
+# shared by all sessions of the process
+render_cache = RenderCache()
+
+
+def configure_render_cache(config: dict) -> None:
+    """
+    Apply the ``render_mb`` and ``render_disk_mb`` budgets of the ``cache`` section
+    of the dashboard config.
+    """
+    if "render_mb" in config:
+        render_cache.memory.resize(int(float(config["render_mb"]) * 1024**2))
+    if "render_disk_mb" in config:
+        render_cache.disk_bytes = int(float(config["render_disk_mb"]) * 1024**2)
@@ -45,6 +45,11 @@ class SiPMMonitoring(Monitoring):
 
     # self._get_sipm_data()
 
+    @staticmethod
+    def data_files(sipm_path: str, period: str, run: str) -> list[str]:
+        """SiPM monitoring HDF file of a run."""
+        return [sipm_path + f"{period}_{run}_spmmon.hdf"]
+
     @param.depends("sipm_sort_by", watch=True)
     def update_barrels(self):
         start_time = time.time()
@@ -64,7 +69,7 @@ class SiPMMonitoring(Monitoring):
     @param.depends("run", watch=True)
     def _get_sipm_data(self):
         start_time = time.time()
-        data_file = self.sipm_path + f"{self.period}_{self.run}_spmmon.hdf"
+        (data_file,) = self.data_files(self.sipm_path, self.period, self.run)
         if not Path(data_file).exists():
             self.sipm_data_df = pd.DataFrame()
         else:
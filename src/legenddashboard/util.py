@@ -1,25 +1,28 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import hashlib
+import logging
+import os
+import pickle as pkl
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
 from datetime import UTC, datetime
 from pathlib import Path
 
 import importlib.resources
 
-import matplotlib as mpl
 import numpy as np
-import panel as pn
 from dbetto import AttrsDict, Props, TextDB
 from dbetto.catalog import Catalog
-from legendmeta import LegendMetadata
+from dbetto.time import unix_time
+from git import InvalidGitRepositoryError, NoSuchPathError, Repo
 
-# somehow TUM server needs Agg -> needs fix in the future
-mpl.use("Agg")
-
-# use terminal and tabulator extensions, sizing mode stretch enables nicer layout
-pn.extension("terminal")
-pn.extension("tabulator")
-pn.extension("plotly")
-pn.extension("katex", "mathjax")
+log = logging.getLogger(__name__)
 
 logo_path = importlib.resources.files("legenddashboard") / "logos"
 
@@ -44,110 +47,780 @@ sort_dict = {
 }
 
 
-def read_config(config: str | dict) -> AttrsDict:
+def read_config(config: str | dict, section: str = "paths") -> AttrsDict:
     """
-    Parse the config file or dictionary and return an AttrsDict.
+    Parse the config file or dictionary and return ``section`` as an AttrsDict.
+
+    Sections other than ``paths`` are optional and empty when missing.
     """
     if isinstance(config, str | Path):
         config = AttrsDict(Props.read_from(config))
     else:
         config = AttrsDict(config)
 
-    return config.paths
+    if section == "paths":
+        return config.paths
+    return AttrsDict(config.get(section) or {})
+
+
+def snapshot_file(snapshot_dir, path, name: str, suffix: str = ".pkl") -> Path:
+    """
+    Location of an on-disk snapshot or store for a production path.
+    """
+    digest = hashlib.sha1(str(Path(path).resolve()).encode()).hexdigest()[:16]
+    return Path(snapshot_dir) / "legend-dashboard" / f"{digest}-{name}{suffix}"
+
+
+def read_snapshot(file, key):
+    """
+    Load the data stored in a snapshot, ``None`` if missing or built for another key.
+    """
+    try:
+        with Path(file).open("rb") as f:
+            stored_key, data = pkl.load(f)
+    except (OSError, EOFError, ValueError, pkl.UnpicklingError):
+        return None
+    if stored_key != key:
+        return None
+    return data
+
+
+def write_snapshot(file, key, data) -> None:
+    """
+    Atomically write a snapshot so concurrent readers never see partial files.
+    """
+    file = Path(file)
+    tmp_file = file.with_name(f"{file.name}.{os.getpid()}-{threading.get_ident()}")
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_file.open("wb") as f:
+            pkl.dump((key, data), f, protocol=pkl.HIGHEST_PROTOCOL)
+        tmp_file.replace(file)
+    except OSError:
+        log.warning("could not write snapshot %s", file)
+        tmp_file.unlink(missing_ok=True)
+
+
+def estimate_nbytes(obj) -> int:
+    """
+    Approximate memory held by nested dictionaries, lists and arrays.
+    """
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_nbytes(key) + estimate_nbytes(value)
+    elif isinstance(obj, list | tuple | set):
+        for value in obj:
+            size += estimate_nbytes(value)
+    return size
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by the estimated size of its values.
+
+    Keys are tuples starting with a partition, e.g. the period, whose size is
+    tracked so partitions can be inspected and dropped as a whole.
+    """
+
+    def __init__(self, max_bytes: int = 1024**3):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._partitions = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes: int | None = None) -> None:
+        """
+        Store ``value``, evicting the least recently used entries beyond the budget.
+        """
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            self._remove(key)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._partitions[key[0]] += nbytes
+            self.nbytes += nbytes
+            self._evict()
+
+    def grow(self, key, nbytes: int) -> None:
+        """
+        Add ``nbytes`` to the size of the entry of ``key``, e.g. for data built
+        lazily on a cached value, evicting entries beyond the budget.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            self._entries[key] = (entry[0], entry[1] + nbytes)
+            self._partitions[key[0]] += nbytes
+            self.nbytes += nbytes
+            self._evict()
+
+    def items(self) -> list:
+        """Snapshot of the entries, not counted as accesses."""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def discard(self, key) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self, partition=None) -> None:
+        """
+        Drop all entries, or only the ones of ``partition``.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if partition is None or key[0] == partition:
+                    self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "partitions": dict(self._partitions),
+            }
+
+    def _remove(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.nbytes -= entry[1]
+        self._partitions[key[0]] -= entry[1]
+        if self._partitions[key[0]] <= 0:
+            del self._partitions[key[0]]
+
+    def _evict(self) -> None:
+        while self.nbytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+
+def read_ahead(files) -> None:
+    """
+    Read ``files`` through once so the following reads are served from the page
+    cache, missing files are skipped.
+    """
+    buffer = bytearray(1024**2)
+    for file in files:
+        try:
+            with Path(file).open("rb", buffering=0) as f:
+                while f.readinto(buffer):
+                    pass
+        except OSError:
+            continue
+
+
+def _mtime(path):
+    try:
+        return Path(path).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class LazyCatalog:
+    """
+    Validity catalog whose entries are only loaded on the first lookup hitting them.
+
+    Mirrors :meth:`dbetto.catalog.Catalog.valid_for`, the object for a validity
+    entry is produced by ``loader(valid_from, system)`` and memoized. Entries for
+    which the loader returns ``None`` are skipped and the previous entry is used.
+    """
+
+    def __init__(self, catalog: Catalog, loader, on_load=None):
+        self.catalog = catalog
+        self.loader = loader
+        self.on_load = on_load
+        self.cached_entries = {}
+        self._indices = {}
+        self._lock = threading.Lock()
+
+    def _load(self, system, valid_from):
+        key = (system, valid_from)
+        with self._lock:
+            if key not in self.cached_entries:
+                self.cached_entries[key] = self.loader(valid_from, system)
+                if self.on_load is not None:
+                    self.on_load()
+            return self.cached_entries[key]
+
+    def _index(self, system):
+        """Sorted ``valid_from`` of the entries of ``system``, compiled on first use."""
+        index = self._indices.get(system)
+        if index is None:
+            index = np.array(
+                [entry.valid_from for entry in self.catalog.entries[system]],
+                dtype=np.int64,
+            )
+            self._indices[system] = index
+        return index
+
+    def _resolve(self, system, pos):
+        entries = self.catalog.entries[system]
+        while pos > 0:
+            if self._load(system, entries[pos - 1].valid_from) is not None:
+                return (system, entries[pos - 1].valid_from)
+            pos -= 1
+        return None
+
+    def valid_entries(self, timestamps, system="all", allow_none=False) -> list:
+        """
+        Keys ``(system, valid_from)`` of the validity entries used for ``timestamps``.
+
+        All timestamps are located with a single :func:`numpy.searchsorted` on the
+        compiled index, timestamps sharing a key get the same object from
+        :meth:`entry`.
+        """
+        timestamps = list(timestamps)
+        keys = [None] * len(timestamps)
+        if system in self.catalog.entries:
+            times = np.array([unix_time(ts) for ts in timestamps], dtype=np.int64)
+            positions = np.searchsorted(self._index(system), times, side="right")
+            resolved = {
+                pos: self._resolve(system, pos) for pos in np.unique(positions).tolist()
+            }
+            keys = [resolved[pos] for pos in positions.tolist()]
+
+        missing = [i for i, key in enumerate(keys) if key is None]
+        if missing and system != "all":
+            fallback = self.valid_entries(
+                [timestamps[i] for i in missing], "all", allow_none=allow_none
+            )
+            for i, key in zip(missing, fallback, strict=True):
+                keys[i] = key
+        elif missing and not allow_none:
+            msg = (
+                f"No valid entries found for timestamp: {timestamps[missing[0]]}, "
+                f"system: {system}"
+            )
+            raise RuntimeError(msg)
+        return keys
+
+    def valid_entry(self, timestamp, system="all", allow_none=False):
+        """
+        Key ``(system, valid_from)`` of the validity entry used for ``timestamp``.
+        """
+        return self.valid_entries([timestamp], system, allow_none=allow_none)[0]
+
+    def valid_for_many(self, timestamps, system="all", allow_none=False) -> list:
+        """Objects valid for each of ``timestamps``, see :meth:`valid_entries`."""
+        keys = self.valid_entries(timestamps, system, allow_none=allow_none)
+        return [self.entry(key) for key in keys]
+
+    def entry(self, key):
+        """Object of a key returned by :meth:`valid_entries`."""
+        if key is None:
+            return None
+        return self.cached_entries[key]
+
+    def valid_for(self, timestamp, system="all", allow_none=False):
+        return self.entry(self.valid_entry(timestamp, system, allow_none=allow_none))
+
+
+channel_table_fields = {
+    "name": "name",
+    "rawid": "daq.rawid",
+    "system": "system",
+    "string": "location.string",
+    "position": "location.position",
+    "cc4_id": "electronics.cc4.id",
+    "cc4_channel": "electronics.cc4.channel",
+    "hv_card": "voltage.card.id",
+    "hv_channel": "voltage.channel",
+    "daq_crate": "daq.crate",
+    "daq_card": "daq.card.id",
+    "daq_channel": "daq.channel",
+    "type": "type",
+}
+
+# ChannelTable columns ordering the channels for each entry of sort_dict,
+# the last column orders channels inside a group
+channel_table_sort_columns = {
+    "String": ("string", "position"),
+    "CC4": ("cc4_id", "cc4_channel"),
+    "HV": ("hv_card", "hv_channel"),
+    "Det_Type": ("type", "name"),
+    "DAQ": ("daq_crate", "daq_card", "daq_channel"),
+}
+
+
+class ChannelTable:
+    """
+    Struct-of-arrays view of a channel map with one row per channel.
+
+    Each column holds the values of one channel map field together with a mask
+    of the channels defining it. Sort codes for a column are computed per system
+    on first use, as e.g. ``location.position`` is a number for germanium
+    detectors but a string for SiPMs. Columns whose values can not be ordered
+    within a system have no codes and :meth:`group` returns ``None`` for
+    orderings using them.
+    """
+
+    def __init__(self, chmap):
+        self.size = len(chmap)
+        self.values = {}
+        self.present = {}
+        for column, field in channel_table_fields.items():
+            values = np.empty(self.size, dtype=object)
+            present = np.zeros(self.size, dtype=bool)
+            for i, entry in enumerate(chmap.values()):
+                value = entry
+                try:
+                    for k in field.split("."):
+                        value = value[k]
+                except (KeyError, TypeError):
+                    continue
+                values[i] = value
+                present[i] = True
+            self.values[column] = values
+            self.present[column] = present
+        self._codes = {}
+        self._lookups = None
+
+    def codes(self, column, system="geds"):
+        """
+        Integer sort codes of ``column`` among the channels of ``system``, -1 for
+        missing values and other systems.
+        """
+        key = (system, column)
+        if key not in self._codes:
+            codes = np.full(self.size, -1, dtype=np.int64)
+            present = self.present[column] & (self.values["system"] == system)
+            try:
+                uniques, inverse = np.unique(
+                    self.values[column][present], return_inverse=True
+                )
+            except TypeError:
+                uniques = None
+            else:
+                codes[present] = inverse
+            self._codes[key] = (codes, uniques)
+        return self._codes[key]
+
+    def group(self, key, system="geds"):
+        """
+        Channel names of ``system`` grouped by the ordering ``key`` of
+        :data:`sort_dict`.
+
+        Returns a list of ``(group values, names)`` in sort order or ``None`` if
+        the ordering can not be computed from the table.
+        """
+        columns = channel_table_sort_columns[key]
+        mask = self.values["system"] == system
+        codes = []
+        for column in columns:
+            column_codes, uniques = self.codes(column, system)
+            if uniques is None:
+                return None
+            mask &= self.present[column]
+            codes.append(column_codes)
+
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return []
+        codes = np.stack([c[rows] for c in codes])
+        order = np.lexsort(codes[::-1])
+        rows, codes = rows[order], codes[:, order]
+
+        group_change = np.any(np.diff(codes[:-1], axis=1) != 0, axis=0)
+        if np.any(~group_change & (np.diff(codes[-1]) == 0)):
+            # channels sharing a position can not be ordered
+            return None
+        bounds = np.flatnonzero(group_change) + 1
+
+        names = self.values["name"]
+        out = []
+        for group_rows in np.split(rows, bounds):
+            group_values = tuple(
+                self.values[column][group_rows[0]] for column in columns[:-1]
+            )
+            out.append((group_values, tuple(names[group_rows].tolist())))
+        return out
+
+    def _build_lookups(self):
+        present = self.present["rawid"]
+        names = self.values["name"][present].tolist()
+        rawids = [int(rawid) for rawid in self.values["rawid"][present]]
+        self._lookups = (
+            dict(zip(names, rawids, strict=True)),
+            dict(zip(rawids, names, strict=True)),
+        )
+
+    def name_to_rawid(self) -> dict:
+        if self._lookups is None:
+            self._build_lookups()
+        return dict(self._lookups[0])
+
+    def rawid_to_name(self) -> dict:
+        if self._lookups is None:
+            self._build_lookups()
+        return dict(self._lookups[1])
+
+
+# sort_dets objects with a snapshot, written when the process exits
+_snapshot_owners = weakref.WeakSet()
+
+
+@atexit.register
+def _save_snapshots() -> None:
+    for owner in list(_snapshot_owners):
+        owner.save_snapshot()
 
 
 class sort_dets:
-    def __init__(self, path):
+    def __init__(self, path, snapshot_dir=None):
         self.cached_chmaps = {}
         self.cached_det_status = {}
+        # sorter output keyed by validity entries, sort key, datatype and spms
+        self.sorted_channels = {}
+        # ChannelTable keyed by channel map validity entry
+        self.channel_tables = {}
 
         path = Path(path)
 
         self.prod_config = path / "dataflow-config.yaml"
         self.prod_config = Props.read_from(self.prod_config, subst_pathvar=True)
 
-        meta_path = Path(self.prod_config["paths"]["metadata"])
-        chmap_path = Path(self.prod_config["paths"]["chan_map"])
-        chmap_catalog = Catalog.read_from(chmap_path / "channelmaps" / "validity.yaml")
-        chmap_entries = {}
-        meta = LegendMetadata(meta_path, lazy=False)
-        for system in chmap_catalog.entries:
-            chmap_entries[system] = []
-            for entry in chmap_catalog.entries[system]:
-                try:
-                    db = meta.channelmap(
-                        datetime.fromtimestamp(entry.valid_from, tz=UTC), system=system
-                    )
-                    new_entry = Catalog.Entry(entry.valid_from, db)
-                    chmap_entries[system].append(new_entry)
-                except RuntimeError:
-                    continue
+        self._meta = None
+        self._textdb = None
 
-        self.chmaps = Catalog(chmap_entries)
+        chmap_validity = (
+            Path(self.prod_config["paths"]["chan_map"])
+            / "channelmaps"
+            / "validity.yaml"
+        )
+        # entries loaded since the snapshot was written
+        self._snapshot_dirty = False
+        self._snapshot_lock = threading.Lock()
+        chmap_catalog = Catalog.read_from(chmap_validity)
+        self.chmaps = LazyCatalog(
+            chmap_catalog, self._load_chmap, on_load=self._mark_dirty
+        )
 
         status_path = Path(self.prod_config["paths"]["detector_status"]) / "statuses"
         status_catalog = Catalog.read_from(status_path / "validity.yaml")
-        status_entries = {}
-        textdb = TextDB(status_path, lazy=False)
-        for system in status_catalog.entries:
-            status_entries[system] = []
-            for entry in status_catalog.entries[system]:
-                db = textdb.on(
-                    datetime.fromtimestamp(entry.valid_from, tz=UTC), system=system
-                )
-                new_entry = Catalog.Entry(entry.valid_from, db)
-                status_entries[system].append(new_entry)
+        self.statuses = LazyCatalog(
+            status_catalog, self._load_status, on_load=self._mark_dirty
+        )
 
-        self.statuses = Catalog(status_entries)
+        self.snapshot_file = None
+        if snapshot_dir is not None:
+            self.snapshot_file = snapshot_file(snapshot_dir, path, "sort_dets")
+            self.snapshot_key = (
+                metadata_revision(self.prod_config),
+                _mtime(chmap_validity),
+                _mtime(status_path / "validity.yaml"),
+            )
+            snapshot = read_snapshot(self.snapshot_file, self.snapshot_key)
+            if snapshot is not None:
+                log.debug("using sort_dets snapshot %s", self.snapshot_file)
+                self.chmaps.cached_entries.update(snapshot["chmaps"])
+                self.statuses.cached_entries.update(snapshot["statuses"])
+            _snapshot_owners.add(self)
 
+    def _mark_dirty(self):
+        self._snapshot_dirty = True
 
-def gen_run_dict(path):
-    prod_config = Path(path) / "dataflow-config.yaml"
-    prod_config = Props.read_from(prod_config, subst_pathvar=True)  # ["setups"]["l200"]
-    par_file = Path(prod_config["paths"]["par_hit"]) / "validity.yaml"
-    run_dict = {}
-    file = Props.read_from(par_file)
-    for entry in file:
-        experiment, period, run, _, _, _ = entry["apply"][0].split("/")[-1].split("-")
-        timestamp = entry["valid_from"]
-        if (
-            Path(prod_config["paths"]["par_hit"])
-            / f"cal/{period}/{run}"
-            / f"{experiment}-{period}-{run}-cal-{timestamp}-par_hit.yaml"
-        ).exists():
-            if period in run_dict:
-                run_dict[period][run] = {
-                    "experiment": experiment,
-                    "timestamp": timestamp,
+    def save_snapshot(self) -> None:
+        """
+        Write the loaded entries to the snapshot if entries were loaded since it
+        was last written. Called after sorting and when the process exits.
+        """
+        if self.snapshot_file is None or not self._snapshot_dirty:
+            return
+        with self._snapshot_lock:
+            if not self._snapshot_dirty:
+                return
+            self._snapshot_dirty = False
+            with self.chmaps._lock, self.statuses._lock:
+                data = {
+                    "chmaps": dict(self.chmaps.cached_entries),
+                    "statuses": dict(self.statuses.cached_entries),
                 }
-            else:
-                run_dict[period] = {
-                    run: {"experiment": experiment, "timestamp": timestamp}
-                }
-    return run_dict
+            write_snapshot(self.snapshot_file, self.snapshot_key, data)
 
+    def channel_table(self, timestamp, system="all") -> ChannelTable:
+        return self.entry_table(self.chmaps.valid_entry(timestamp, system=system))
 
-def sorter(
-    path, timestamp, key="String", datatype="cal", spms=False, sort_dets_obj=None
-):
-    if sort_dets_obj is not None:
-        chmap = sort_dets_obj.chmaps.valid_for(timestamp, system=datatype)
-        det_status = sort_dets_obj.statuses.valid_for(timestamp, system=datatype)
-    else:
-        prod_config = Path(path) / "dataflow-config.yaml"
-        prod_config = Props.read_from(
-            prod_config, subst_pathvar=True
-        )  # ["setups"]["l200"]
+    def load_runs(self, timestamps, system="all") -> tuple[list, list]:
+        """
+        Channel maps and statuses valid for each of ``timestamps``, e.g. the runs
+        of a period, resolved with one batched lookup per catalog.
+        """
+        return (
+            self.chmaps.valid_for_many(timestamps, system=system),
+            self.statuses.valid_for_many(timestamps, system=system),
+        )
+
+    def entry_table(self, key) -> ChannelTable:
+        """:class:`ChannelTable` of the channel map entry ``key``."""
+        if key not in self.channel_tables:
+            self.channel_tables[key] = ChannelTable(self.chmaps.entry(key))
+        return self.channel_tables[key]
+
+    def _load_chmap(self, valid_from, system):
+        if self._meta is None:
+            from legendmeta import LegendMetadata
 
-        cfg_file = prod_config["paths"]["metadata"]
-        configs = LegendMetadata(path=cfg_file)
-        chmap = configs.channelmap(timestamp)
+            meta_path = Path(self.prod_config["paths"]["metadata"])
+            self._meta = LegendMetadata(meta_path, lazy=True)
+        try:
+            return self._meta.channelmap(
+                datetime.fromtimestamp(valid_from, tz=UTC), system=system
+            )
+        except RuntimeError:
+            return None
 
-        det_status_path = prod_config["paths"]["detector_status"]
-        det_status = LegendMetadata(path=det_status_path, lazy=True).statuses.on(
-            timestamp, system=datatype
+    def _load_status(self, valid_from, system):
+        if self._textdb is None:
+            status_path = (
+                Path(self.prod_config["paths"]["detector_status"]) / "statuses"
+            )
+            self._textdb = TextDB(status_path, lazy=True)
+        return self._textdb.on(
+            datetime.fromtimestamp(valid_from, tz=UTC), system=system
         )
 
+
+_sort_dets_registry = {}
+_registry_lock = threading.Lock()
+# seconds for which the metadata revision of a production is reused
+revision_interval = 30.0
+# resolved production path -> (time of the check, metadata revision)
+_revisions = {}
+
+
+def metadata_revision(prod_config: dict) -> tuple:
+    """
+    Revision of the channel map and detector status metadata used by a production.
+
+    The git commit of each repository is used, for directories that are not git
+    repositories the modification time of the validity file is used instead.
+    """
+    revision = []
+    for key, validity in [
+        ("chan_map", Path("channelmaps") / "validity.yaml"),
+        ("detector_status", Path("statuses") / "validity.yaml"),
+    ]:
+        path = Path(prod_config["paths"][key])
+        try:
+            repo = Repo(path, search_parent_directories=True)
+            revision.append(repo.head.commit.hexsha)
+        except (InvalidGitRepositoryError, NoSuchPathError, ValueError):
+            try:
+                revision.append((path / validity).stat().st_mtime_ns)
+            except OSError:
+                revision.append(None)
+    return tuple(revision)
+
+
+def get_sort_dets(path, snapshot_dir=None) -> sort_dets:
+    """
+    Get the process wide :class:`sort_dets` object for a production path.
+
+    Objects are shared between all monitoring pages and sessions and are keyed by
+    the resolved production path and the metadata revision, a new object is only
+    built if the metadata changed. The revision is checked at most every
+    :data:`revision_interval` seconds per path. The returned object must not be
+    modified. If ``snapshot_dir`` is given, resolved entries are persisted there
+    and reused on the next start as long as the metadata is unchanged.
+    """
+    path = Path(path).resolve()
+    now = time.monotonic()
+    with _registry_lock:
+        checked = _revisions.get(str(path))
+    if checked is None or now - checked[0] >= revision_interval:
+        prod_config = Props.read_from(path / "dataflow-config.yaml", subst_pathvar=True)
+        checked = (now, metadata_revision(prod_config))
+        with _registry_lock:
+            _revisions[str(path)] = checked
+    key = (str(path), checked[1])
+    with _registry_lock:
+        if key not in _sort_dets_registry:
+            log.debug("building sort_dets for %s", key)
+            # drop objects built for an older metadata revision of this path
+            for old_key in [k for k in _sort_dets_registry if k[0] == key[0]]:
+                del _sort_dets_registry[old_key]
+            _sort_dets_registry[key] = sort_dets(path, snapshot_dir=snapshot_dir)
+        return _sort_dets_registry[key]
+
+
+class RunIndex:
+    """
+    Index of the calibration runs which have hit parameters on disk.
+
+    Existence of the parameter files is checked with one directory listing per
+    period (and per run directory needed) instead of one stat call per validity
+    entry. The index is updated incrementally: only validity entries newer than
+    the last indexed ``valid_from`` are processed, together with earlier entries
+    whose files were not on disk yet. These are rechecked on every refresh, the
+    validity file is only parsed again when it changed. If ``snapshot_dir`` is
+    given the index is persisted there and reused by the next process.
+    """
+
+    def __init__(self, path, snapshot_dir=None):
+        prod_config = Path(path) / "dataflow-config.yaml"
+        prod_config = Props.read_from(prod_config, subst_pathvar=True)
+        self.par_hit_path = Path(prod_config["paths"]["par_hit"])
+        self.validity_file = self.par_hit_path / "validity.yaml"
+
+        self.run_dict = {}
+        self.last_valid_from = None
+        self.pending = []
+        self.validity_mtime = None
+        self._lock = threading.Lock()
+
+        self.snapshot_file = None
+        if snapshot_dir is not None:
+            self.snapshot_file = snapshot_file(snapshot_dir, path, "run_index")
+            state = read_snapshot(self.snapshot_file, str(self.validity_file))
+            if state is not None:
+                log.debug("using run index snapshot %s", self.snapshot_file)
+                self.__dict__.update(state)
+
+    def _list_dir(self, path, listings):
+        if path not in listings:
+            try:
+                with os.scandir(path) as it:
+                    listings[path] = {entry.name for entry in it}
+            except OSError:
+                listings[path] = set()
+        return listings[path]
+
+    def refresh(self) -> dict:
+        """
+        Update the index with new validity entries and return the run dictionary.
+        """
+        with self._lock:
+            mtime = _mtime(self.validity_file)
+            candidates = list(self.pending)
+            if mtime != self.validity_mtime:
+                for entry in Props.read_from(self.validity_file):
+                    valid_from = unix_time(entry["valid_from"])
+                    if (
+                        self.last_valid_from is None
+                        or valid_from > self.last_valid_from
+                    ):
+                        candidates.append(entry)
+            elif not candidates:
+                return self.run_dict
+            candidates = sorted(candidates, key=lambda x: unix_time(x["valid_from"]))
+
+            listings = {}
+            pending = []
+            updated_periods = set()
+            for entry in candidates:
+                experiment, period, run, _, _, _ = (
+                    entry["apply"][0].split("/")[-1].split("-")
+                )
+                timestamp = entry["valid_from"]
+                period_path = self.par_hit_path / f"cal/{period}"
+                if run not in self._list_dir(period_path, listings) or (
+                    f"{experiment}-{period}-{run}-cal-{timestamp}-par_hit.yaml"
+                    not in self._list_dir(period_path / run, listings)
+                ):
+                    pending.append(entry)
+                    continue
+                if period in self.run_dict:
+                    self.run_dict[period][run] = {
+                        "experiment": experiment,
+                        "timestamp": timestamp,
+                    }
+                else:
+                    self.run_dict[period] = {
+                        run: {"experiment": experiment, "timestamp": timestamp}
+                    }
+                updated_periods.add(period)
+
+            # late files can be added out of order, keep runs sorted in time
+            for period in updated_periods:
+                self.run_dict[period] = dict(
+                    sorted(
+                        self.run_dict[period].items(),
+                        key=lambda x: unix_time(x[1]["timestamp"]),
+                    )
+                )
+
+            for entry in candidates:
+                valid_from = unix_time(entry["valid_from"])
+                if self.last_valid_from is None or valid_from > self.last_valid_from:
+                    self.last_valid_from = valid_from
+            changed = mtime != self.validity_mtime or len(pending) != len(self.pending)
+            self.pending = pending
+            self.validity_mtime = mtime
+
+            if changed and self.snapshot_file is not None:
+                write_snapshot(
+                    self.snapshot_file,
+                    str(self.validity_file),
+                    {
+                        "run_dict": self.run_dict,
+                        "last_valid_from": self.last_valid_from,
+                        "pending": self.pending,
+                        "validity_mtime": self.validity_mtime,
+                    },
+                )
+            return self.run_dict
+
+
+_run_index_registry = {}
+
+
+def gen_run_dict(path, snapshot_dir=None):
+    path = str(Path(path).resolve())
+    with _registry_lock:
+        if path not in _run_index_registry:
+            _run_index_registry[path] = RunIndex(path, snapshot_dir=snapshot_dir)
+        run_index = _run_index_registry[path]
+    return {period: dict(runs.items()) for period, runs in run_index.refresh().items()}
+
+
+def _sort_channels(chmap, key, spms, table=None):
+    """Group the channel names of ``chmap`` by ``key``, returns tuples of names."""
+    if table is not None and not spms:
+        groups = table.group(key)
+        if groups is not None:
+            if key == "DAQ":
+                out_dict = {f"DAQ:Cr{k:02},Ch{m:02}": names for (k, m), names in groups}
+            else:
+                out_key = sort_dict[key]["out_key"]
+                out_dict = {
+                    out_key.format(key=key, k=k): names for (k,), names in groups
+                }
+            return out_dict, chmap
+
     out_dict = {}
     # SiPMs sorting
     if spms:
@@ -156,12 +829,12 @@ def sorter(
             mapping = chmap.map("name")
             for pos in ["top", "bottom"]:
                 for barrel in ["IB", "OB"]:
-                    out_dict[f"{barrel}-{pos}"] = [
+                    out_dict[f"{barrel}-{pos}"] = tuple(
                         k
                         for k, entry in sorted(mapping.items())
                         if barrel in entry["location"]["fiber"]
                         and pos in entry["location"]["position"]
-                    ]
+                    )
         return out_dict, chmap
 
     # Daq needs special item as sort on tertiary key
@@ -169,26 +842,79 @@ def sorter(
         mapping = chmap.map("daq.crate", unique=False)
         for k, entry in sorted(mapping.items()):
             for m, item in sorted(entry.map("daq.card.id", unique=False).items()):
-                out_dict[f"DAQ:Cr{k:02},Ch{m:02}"] = [
-                    item.map("daq.channel")[pos].name
-                    for pos in sorted(item.map("daq.channel"))
-                    if item.map("daq.channel")[pos].system == "geds"
-                ]
+                channels = item.map("daq.channel")
+                out_dict[f"DAQ:Cr{k:02},Ch{m:02}"] = tuple(
+                    channels[pos].name
+                    for pos in sorted(channels)
+                    if channels[pos].system == "geds"
+                )
     else:
         out_key = sort_dict[key]["out_key"]
         primary_key = sort_dict[key]["primary_key"]
         secondary_key = sort_dict[key]["secondary_key"]
         mapping = chmap.map(primary_key, unique=False)
         for k, entry in sorted(mapping.items()):
-            out_dict[out_key.format(key=key, k=k)] = [
-                entry.map(secondary_key)[pos].name
-                for pos in sorted(entry.map(secondary_key))
-                if entry.map(secondary_key)[pos].system == "geds"
-            ]
+            channels = entry.map(secondary_key)
+            out_dict[out_key.format(key=key, k=k)] = tuple(
+                channels[pos].name
+                for pos in sorted(channels)
+                if channels[pos].system == "geds"
+            )
 
     out_dict = {
         entry: out_dict[entry] for entry in list(out_dict) if len(out_dict[entry]) > 0
     }
+    return out_dict, chmap
+
+
+def sorter(
+    path, timestamp, key="String", datatype="cal", spms=False, sort_dets_obj=None
+):
+    """
+    Sort the channels valid at ``timestamp`` by ``key``.
+
+    Returns ``(out_dict, det_status, chmap)`` or ``(out_dict, chmap)`` for SiPMs.
+    With ``sort_dets_obj`` the result is memoized per validity entry of the
+    channel map and status catalogs, callers get fresh channel lists and SiPM
+    channel map as without it.
+    """
+    if sort_dets_obj is not None:
+        chmap_key = sort_dets_obj.chmaps.valid_entry(timestamp, system=datatype)
+        status_key = sort_dets_obj.statuses.valid_entry(timestamp, system=datatype)
+        memo_key = (chmap_key, status_key, key, datatype, spms)
+        result = sort_dets_obj.sorted_channels.get(memo_key)
+        if result is None:
+            chmap = sort_dets_obj.chmaps.entry(chmap_key)
+            det_status = sort_dets_obj.statuses.entry(status_key)
+            table = sort_dets_obj.entry_table(chmap_key)
+            out_dict, chmap = _sort_channels(chmap, key, spms, table=table)
+            result = (out_dict, chmap) if spms else (out_dict, det_status, chmap)
+            sort_dets_obj.sorted_channels[memo_key] = result
+            sort_dets_obj.save_snapshot()
+        # copies so callers can not alter the memoized grouping
+        out_dict = {group: list(names) for group, names in result[0].items()}
+        if spms:
+            return out_dict, copy.copy(result[1])
+        return out_dict, *result[1:]
+
+    from legendmeta import LegendMetadata
+
+    prod_config = Path(path) / "dataflow-config.yaml"
+    prod_config = Props.read_from(prod_config, subst_pathvar=True)  # ["setups"]["l200"]
+
+    cfg_file = prod_config["paths"]["metadata"]
+    configs = LegendMetadata(path=cfg_file)
+    chmap = configs.channelmap(timestamp)
+
+    det_status_path = prod_config["paths"]["detector_status"]
+    det_status = LegendMetadata(path=det_status_path, lazy=True).statuses.on(
+        timestamp, system=datatype
+    )
+
+    out_dict, chmap = _sort_channels(chmap, key, spms)
+    out_dict = {group: list(names) for group, names in out_dict.items()}
+    if spms:
+        return out_dict, chmap
     return out_dict, det_status, chmap
 
 
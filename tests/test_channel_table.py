@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from dbetto import AttrsDict
+
+from legenddashboard.util import ChannelTable, _sort_channels
+
+
+def _chmap():
+    chmap = {}
+    rawid = 1000000
+    for string in [2, 1]:
+        for position in [3, 1, 2]:
+            rawid += 1
+            name = f"V0{string}{position}00A"
+            chmap[name] = {
+                "name": name,
+                "system": "geds",
+                "location": {"string": string, "position": position},
+                "daq": {"rawid": rawid, "crate": 0, "card": {"id": string}},
+            }
+    for i, position in enumerate(["top", "bottom"]):
+        rawid += 1
+        name = f"S0{i}{i}"
+        chmap[name] = {
+            "name": name,
+            "system": "spms",
+            "location": {"fiber": "IB", "position": position},
+            "daq": {"rawid": rawid, "crate": 1, "card": {"id": 1}, "channel": i},
+        }
+    return AttrsDict(chmap)
+
+
+def test_group_by_string_with_sipm_positions():
+    chmap = _chmap()
+    table = ChannelTable(chmap)
+
+    groups = table.group("String")
+    assert groups == [
+        ((1,), ("V01100A", "V01200A", "V01300A")),
+        ((2,), ("V02100A", "V02200A", "V02300A")),
+    ]
+    assert _sort_channels(chmap, "String", False, table=table) == _sort_channels(
+        chmap, "String", False
+    )
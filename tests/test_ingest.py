@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import yaml
+
+from legenddashboard.geds.cal.ingest import PeriodStore, ingest_period, par_file
+from legenddashboard.geds.cal.pars import read_par_file
+from legenddashboard.geds.cal.quantities import project_pars
+
+RUN_DICT = {
+    "r000": {"experiment": "l200", "timestamp": "20230110T000000Z"},
+    "r001": {"experiment": "l200", "timestamp": "20230117T000000Z"},
+}
+
+HIT_PARS = {
+    "V00000A": {
+        "pars": {
+            "operations": {
+                "cuspEmax_ctc_cal": {
+                    "expression": "a*cuspEmax_ctc+b",
+                    "parameters": {"a": 0.1, "b": 1},
+                }
+            }
+        },
+        "results": {
+            "ecal": {
+                "cuspEmax_ctc_cal": {
+                    "total_fep": 1200,
+                    "pk_fits": {
+                        2614.511: {
+                            "fwhm_in_kev": 2.5,
+                            "parameters": {"mu": 26135.1},
+                            "validity": True,
+                        }
+                    },
+                }
+            },
+            "aoe": {"1000-1300keV": {0: {"mean": 1.0, "res": 0.01}}, "low_cut": -2},
+        },
+    },
+    # missing quantities and a non numeric one
+    "V00000B": {
+        "results": {"ecal": {"cuspEmax_ctc_cal": {"total_fep": "n/a"}}},
+    },
+}
+
+DSP_PARS = {"V00000A": {"pz": {"tau1": "500.0*us"}}, "V00000B": {}}
+
+
+def _write_pars(prod_config, run):
+    for tier, pars in [("hit", HIT_PARS), ("dsp", DSP_PARS)]:
+        file = par_file(prod_config, "p03", run, RUN_DICT[run], tier)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(yaml.safe_dump(pars))
+
+
+def _assert_same(run_pars, expected):
+    assert list(run_pars) == list(expected)
+    np.testing.assert_array_equal(run_pars.present, expected.present)
+    for name in expected.values.dtype.names:
+        left, right = run_pars.column(name), expected.column(name)
+        if left.dtype == object:
+            assert left.tolist() == right.tolist(), name
+        else:
+            np.testing.assert_array_equal(left, right, err_msg=name)
+
+
+def test_ingested_run_pars_round_trip(tmp_path):
+    prod_config = {
+        "paths": {
+            "par_hit": str(tmp_path / "par/hit"),
+            "par_dsp": str(tmp_path / "par/dsp"),
+        }
+    }
+    _write_pars(prod_config, "r000")
+    store = PeriodStore(ingest_period(tmp_path / "store", prod_config, "p03", RUN_DICT))
+
+    for tier in ["hit", "dsp"]:
+        source = par_file(prod_config, "p03", "r000", RUN_DICT["r000"], tier)
+        expected = project_pars(read_par_file(source), tier)
+        _assert_same(store.run_pars("r000", tier, source=source), expected)
+    # r001 has no par files
+    assert store.run_pars("r001") is None
+
+    source = par_file(prod_config, "p03", "r000", RUN_DICT["r000"])
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.run_pars("r000", source=source) is None
+    assert store.run_pars("r000") is not None
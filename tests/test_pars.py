@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import dbm.dumb
+import os
+import shelve
+
+from legenddashboard.geds.cal import pars
+from legenddashboard.geds.cal.ingest import plot_file
+from legenddashboard.util import LRUCache
+
+RUN_INFO = {"experiment": "l200", "timestamp": "20230110T000000Z"}
+
+
+def _write_shelf(file, channels):
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with shelve.Shelf(dbm.dumb.open(str(file), "n")) as shelf:
+        shelf["common"] = {}
+        for channel in channels:
+            shelf[channel] = {"ecal": {"cuspEmax_ctc_cal": {"channel": channel}}}
+
+
+def test_rewritten_dumb_dbm_plot_shelf_is_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(pars, "revalidate_interval", 0.0)
+    prod_config = {"paths": {"plt": str(tmp_path / "plt")}}
+    file = plot_file(prod_config, "p03", "r000", RUN_INFO)
+    cache_data = LRUCache()
+
+    _write_shelf(file, ["ch1000001"])
+    channels, _ = pars.load_plot_index(prod_config, "p03", "r000", RUN_INFO, cache_data)
+    assert channels == ["ch1000001"]
+
+    _write_shelf(file, ["ch1000001", "ch1000002"])
+    # make the change visible on file systems with coarse timestamps
+    data_file = file.with_name(f"{file.name}.dat")
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    channels, _ = pars.load_plot_index(prod_config, "p03", "r000", RUN_INFO, cache_data)
+    assert sorted(channels) == ["ch1000001", "ch1000002"]
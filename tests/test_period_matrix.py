@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import numexpr as ne
+import numpy as np
+
+from legenddashboard.geds.cal.period_matrix import (
+    compile_expression,
+    evaluate_expressions,
+    invert_expressions,
+)
+
+TARGET = 2039.0
+
+
+def test_evaluate_grouped_matches_per_run():
+    expressions = [
+        "a*cuspEmax_ctc+b",
+        "a*cuspEmax_ctc**2+b*cuspEmax_ctc+c",
+        "a*cuspEmax_ctc+b",
+        "a*sqrt(cuspEmax_ctc)+b",
+        "a*cuspEmax_ctc**2+b*cuspEmax_ctc+c",
+    ]
+    variables = [
+        {"a": 0.1, "b": 2, "cuspEmax_ctc": 20000},
+        {"a": 1e-8, "b": 0.1, "c": 1, "cuspEmax_ctc": 19000.5},
+        {"a": 3, "b": -4, "cuspEmax_ctc": 700},
+        {"a": 20, "b": 0.5, "cuspEmax_ctc": 10444},
+        {"a": -2e-8, "b": 0.12, "c": 0, "cuspEmax_ctc": 21000.0},
+    ]
+    out, valid = evaluate_expressions(expressions, variables)
+    assert valid.all()
+    for expression, parameters, value in zip(expressions, variables, out, strict=True):
+        expected = ne.evaluate(
+            expression, local_dict={k: float(v) for k, v in parameters.items()}
+        )
+        assert value == expected
+        # int parameters give the same result as per run evaluation with ints
+        assert np.isclose(value, ne.evaluate(expression, local_dict=parameters))
+
+
+def test_evaluate_flags_missing_inputs():
+    expressions = ["a*cuspEmax_ctc+b", "a*cuspEmax_ctc+b", "a*cuspEmax_ctc+b"]
+    variables = [
+        {"a": 2, "b": 1, "cuspEmax_ctc": 3},
+        {"a": 2, "cuspEmax_ctc": 3},
+        {"a": "x", "b": 1, "cuspEmax_ctc": 3},
+    ]
+    out, valid = evaluate_expressions(expressions, variables)
+    assert valid.tolist() == [True, False, False]
+    assert out[0] == 7.0
+    assert np.isnan(out[1:]).all()
+
+
+def test_compile_expression_is_shared():
+    program, names = compile_expression("a*cuspEmax_ctc+b")
+    assert sorted(names) == ["a", "b", "cuspEmax_ctc"]
+    assert compile_expression("a*cuspEmax_ctc+b")[0] is program
+
+
+def _invert(expression, parameters, **kwargs):
+    out, valid = invert_expressions([expression], [parameters], TARGET, **kwargs)
+    return out[0], valid[0]
+
+
+def test_invert_linear():
+    x, valid = _invert("a*cuspEmax_ctc+b", {"a": 0.1, "b": 2.5})
+    assert valid
+    assert np.isclose(x, (TARGET - 2.5) / 0.1, rtol=1e-12)
+
+
+def test_invert_quadratic_both_signs():
+    for a in (1e-8, -1e-8):
+        parameters = {"a": a, "b": 0.1, "c": 1.0}
+        x, valid = _invert("a*cuspEmax_ctc**2+b*cuspEmax_ctc+c", parameters)
+        # root next to the linear solution
+        disc = np.sqrt(0.1**2 + 4 * a * (TARGET - 1.0))
+        assert valid
+        assert np.isclose(x, (-0.1 + disc) / (2 * a), rtol=1e-9)
+
+
+def test_invert_sqrt():
+    x, valid = _invert("a*sqrt(cuspEmax_ctc)+b", {"a": 20.0, "b": -5.0})
+    assert valid
+    assert np.isclose(x, ((TARGET + 5.0) / 20.0) ** 2, rtol=1e-9)
+
+
+def test_invert_not_invertible():
+    # minimum of the calibration curve is above the target
+    x, valid = _invert("a*cuspEmax_ctc**2+c", {"a": 1e-8, "c": 3000.0})
+    assert not valid
+    assert np.isnan(x)
+
+
+def test_invert_max_iter_checks_last_step():
+    # the quadratic start is not exact for sqrt, the Newton steps converge on the
+    # third step, which must count even though it is the last one allowed
+    parameters = {"a": 20.0, "b": -5.0}
+    expected = ((TARGET + 5.0) / 20.0) ** 2
+    results = [
+        _invert("a*sqrt(cuspEmax_ctc)+b", parameters, max_iter=n) for n in (2, 3)
+    ]
+    assert not results[0][1]
+    assert results[1][1]
+    assert np.isclose(results[1][0], expected, rtol=1e-9)
+
+
+def test_invert_grouped_entries():
+    expressions = ["a*cuspEmax_ctc+b", "a*sqrt(cuspEmax_ctc)+b", "a*cuspEmax_ctc+b"]
+    variables = [{"a": 0.1, "b": 0.0}, {"a": 20.0, "b": 0.0}, {"a": 0.2}]
+    out, valid = invert_expressions(expressions, variables, TARGET)
+    assert valid.tolist() == [True, True, False]
+    assert np.allclose(out[:2], [TARGET / 0.1, (TARGET / 20.0) ** 2], rtol=1e-9)
+    assert np.isnan(out[2])
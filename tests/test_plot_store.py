@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import dbm.dumb
+import os
+import pickle as pkl
+import shelve
+from collections.abc import Mapping
+
+import numpy as np
+
+from legenddashboard.geds.cal.plot_store import (
+    PlotStore,
+    convert_plot_shelf,
+    open_plot_store,
+)
+
+
+def _write_shelf(file, extra=None):
+    rng = np.random.default_rng(1)
+    channel = {
+        "ecal": {
+            "cuspEmax_ctc_cal": {
+                "spectrum": {"bins": np.arange(1000.0), "counts": rng.poisson(5, 999)},
+                "empty": np.empty(0),
+                "names": np.array(["a", None], dtype=object),
+            }
+        },
+        "aoe": {"low_cut": -2.0},
+        "flat": [1, "x", np.arange(3, dtype=np.int16)],
+    }
+    entries = {
+        "common": {"ch1000001": {"baseline": {"bl_array": rng.normal(size=100)}}},
+        "ch1000001": channel,
+        "ch1000002": dict(channel, aoe={}),
+        "info": [1, 2, 3],
+        **(extra or {}),
+    }
+    with shelve.Shelf(
+        dbm.dumb.open(str(file), "n"), protocol=pkl.HIGHEST_PROTOCOL
+    ) as s:
+        s.update(entries)
+    return entries
+
+
+def _assert_same(stored, expected):
+    if isinstance(expected, dict):
+        assert isinstance(stored, Mapping)
+        assert list(stored) == list(expected)
+        for key, value in expected.items():
+            _assert_same(stored[key], value)
+    elif isinstance(expected, np.ndarray):
+        assert stored.dtype == expected.dtype
+        assert stored.shape == expected.shape
+        assert stored.tolist() == expected.tolist()
+    elif isinstance(expected, list):
+        assert len(stored) == len(expected)
+        for left, right in zip(stored, expected, strict=True):
+            _assert_same(left, right)
+    else:
+        assert stored == expected
+
+
+def test_plot_store_matches_shelf(tmp_path):
+    source = tmp_path / "l200-p03-r000-cal-20230110T000000Z-plt_hit"
+    entries = _write_shelf(source)
+    store = PlotStore(convert_plot_shelf(tmp_path / "store", source))
+
+    assert store.keys == list(entries)
+    assert store.channels == [key for key in entries if key != "common"]
+    for key, value in entries.items():
+        _assert_same(store.entry(key), value)
+    _assert_same(store.common, entries["common"])
+
+
+def test_open_plot_store_after_shelf_change(tmp_path):
+    source = tmp_path / "l200-p03-r000-cal-20230110T000000Z-plt_hit"
+    store_dir = tmp_path / "store"
+    _write_shelf(source)
+    assert open_plot_store(store_dir, source) is None
+
+    convert_plot_shelf(store_dir, source)
+    assert open_plot_store(store_dir, source) is not None
+
+    _write_shelf(source, extra={"ch1000003": {}})
+    # make the change visible on file systems with coarse timestamps
+    data_file = source.with_name(f"{source.name}.dat")
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert open_plot_store(store_dir, source) is None
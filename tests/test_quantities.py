@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from legenddashboard.geds.cal.quantities import ParsView, project_pars
+
+PARS = {
+    "V00000A": {
+        "results": {
+            "ecal": {
+                "cuspEmax_ctc_cal": {
+                    "total_fep": 1200,
+                    "pk_fits": {
+                        2614.511: {"fwhm_in_kev": 2.5, "parameters": {"mu": 26135.1}}
+                    },
+                    "not_declared": 1.0,
+                }
+            },
+            "aoe": {"1000-1300keV": {0: {"mean": 1.0, "res": 0.01}}},
+        },
+        "pars": {"operations": {"cuspEmax_ctc_cal": {"parameters": {"a": 1}}}},
+    },
+    "V00000B": {
+        "results": {
+            "ecal": {"cuspEmax_ctc_cal": {"total_fep": "n/a"}},
+            "aoe": {"1000-1300keV": {"0": {"mean": 2.0}}},
+        },
+    },
+    "V00000C": {},
+}
+
+
+def test_parsview_reads_like_par_file():
+    run_pars = project_pars(PARS)
+    assert list(run_pars) == ["V00000A", "V00000B", "V00000C"]
+
+    det = run_pars["V00000A"]
+    assert isinstance(det, ParsView)
+    ecal = det["results"]["ecal"]["cuspEmax_ctc_cal"]
+    assert ecal["total_fep"] == 1200.0
+    # float keyed peak fits
+    assert ecal["pk_fits"][2614.511]["fwhm_in_kev"] == 2.5
+    assert ecal["pk_fits"][2614.511]["parameters"]["mu"] == 26135.1
+    assert list(ecal["pk_fits"]) == [2614.511]
+    assert det["pars"]["operations"]["cuspEmax_ctc_cal"]["parameters"] == {"a": 1}
+    # only declared quantities are kept
+    with pytest.raises(KeyError):
+        ecal["not_declared"]
+    with pytest.raises(KeyError):
+        ecal["pk_fits"][583.191]
+
+
+def test_parsview_missing_keys():
+    run_pars = project_pars(PARS)
+    with pytest.raises(KeyError):
+        run_pars["V00000C"]["results"]
+    assert len(run_pars["V00000C"]) == 0
+    # non numeric values of float quantities are missing
+    with pytest.raises(KeyError):
+        run_pars["V00000B"]["results"]["ecal"]
+    with pytest.raises(KeyError):
+        run_pars["V00000D"]
+
+
+def test_aoe_slice_key_int_and_str():
+    run_pars = project_pars(PARS)
+    aoe_a = run_pars["V00000A"]["results"]["aoe"]["1000-1300keV"]
+    aoe_b = run_pars["V00000B"]["results"]["aoe"]["1000-1300keV"]
+    assert list(aoe_a) == [0]
+    assert aoe_a[0].to_dict() == {"mean": 1.0, "res": 0.01}
+    assert list(aoe_b) == ["0"]
+    assert aoe_b["0"]["mean"] == 2.0
+    with pytest.raises(KeyError):
+        aoe_a["0"]
+    with pytest.raises(KeyError):
+        aoe_b[0]
+
+
+def test_column_and_table_defaults():
+    run_pars = project_pars(PARS)
+    fep = run_pars.column("results.ecal.cuspEmax_ctc_cal.total_fep")
+    assert fep[0] == 1200.0
+    assert np.isnan(fep[1:]).all()
+    fwhm = run_pars.column(
+        "results.ecal.cuspEmax_ctc_cal.pk_fits.[2614.511].fwhm_in_kev"
+    )
+    np.testing.assert_array_equal(fwhm, [2.5, np.nan, np.nan])
+    mean_int = run_pars.column("results.aoe.1000-1300keV.[0].mean")
+    mean_str = run_pars.column("results.aoe.1000-1300keV.0.mean")
+    np.testing.assert_array_equal(mean_int, [1.0, np.nan, np.nan])
+    np.testing.assert_array_equal(mean_str, [np.nan, 2.0, np.nan])
+
+    table = run_pars.table()
+    assert list(table.index) == ["V00000A", "V00000B", "V00000C"]
+    parameters = table["pars.operations.cuspEmax_ctc_cal.parameters"]
+    assert parameters.tolist() == [{"a": 1}, None, None]
+    np.testing.assert_array_equal(
+        table["results.ecal.cuspEmax_ctc_cal.total_fep"], [1200.0, np.nan, np.nan]
+    )
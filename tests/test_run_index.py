@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import yaml
+
+from legenddashboard.util import RunIndex
+
+TIMESTAMP = "20230110T000000Z"
+
+
+def _par_file(par_hit):
+    return par_hit / f"cal/p03/r000/l200-p03-r000-cal-{TIMESTAMP}-par_hit.yaml"
+
+
+def _make_prod(tmp_path):
+    par_hit = tmp_path / "generated/par/hit"
+    par_hit.mkdir(parents=True)
+    (tmp_path / "dataflow-config.yaml").write_text(
+        yaml.safe_dump({"paths": {"par_hit": str(par_hit)}})
+    )
+    (par_hit / "validity.yaml").write_text(
+        yaml.safe_dump(
+            [
+                {
+                    "valid_from": TIMESTAMP,
+                    "category": "all",
+                    "apply": [str(_par_file(par_hit).relative_to(par_hit))],
+                }
+            ]
+        )
+    )
+    return par_hit
+
+
+def test_run_added_when_par_file_appears_after_validity_entry(tmp_path):
+    par_hit = _make_prod(tmp_path)
+    snapshot_dir = tmp_path / "snapshots"
+    run_index = RunIndex(tmp_path, snapshot_dir=snapshot_dir)
+    assert run_index.refresh() == {}
+
+    par_file = _par_file(par_hit)
+    par_file.parent.mkdir(parents=True)
+    par_file.write_text("{}")
+
+    expected = {"p03": {"r000": {"experiment": "l200", "timestamp": TIMESTAMP}}}
+    assert run_index.refresh() == expected
+    assert RunIndex(tmp_path, snapshot_dir=snapshot_dir).refresh() == expected
+
+
+def test_pending_run_found_after_restart(tmp_path):
+    par_hit = _make_prod(tmp_path)
+    snapshot_dir = tmp_path / "snapshots"
+    assert RunIndex(tmp_path, snapshot_dir=snapshot_dir).refresh() == {}
+
+    par_file = _par_file(par_hit)
+    par_file.parent.mkdir(parents=True)
+    par_file.write_text("{}")
+
+    run_index = RunIndex(tmp_path, snapshot_dir=snapshot_dir)
+    assert "r000" in run_index.refresh()["p03"]